@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from functools import cached_property
+from typing import FrozenSet
 import os
 
 class Settings(BaseSettings):
@@ -8,6 +9,8 @@ class Settings(BaseSettings):
     INFLUXDB_TOKEN: str
     INFLUXDB_ORG: str
     INFLUXDB_BUCKET: str
+    # Queue writes and flush them in the background; set false to write synchronously (e.g. tests)
+    INFLUXDB_BATCH_WRITES: bool = True
     
     # API
     API_SECRET_KEY: str
@@ -26,9 +29,13 @@ class Settings(BaseSettings):
     # Moltbook
     MOLTBOOK_API_KEY: str = ""
     
-    @property
-    def device_whitelist(self) -> List[str]:
-        return [d.strip() for d in self.ALLOWED_DEVICE_IDS.split(",")]
+    @cached_property
+    def device_whitelist(self) -> FrozenSet[str]:
+        return frozenset(d.strip() for d in self.ALLOWED_DEVICE_IDS.split(","))
+    
+    @cached_property
+    def api_secret_key_bytes(self) -> bytes:
+        return self.API_SECRET_KEY.encode()
     
     class Config:
         env_file = ".env"
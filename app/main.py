@@ -1,5 +1,5 @@
 from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, Response
 from contextlib import asynccontextmanager
 from app.routes import sensors
 from app.routes import ai
@@ -7,7 +7,13 @@ from app.routes import speech
 from app.routes import dashboard
 from app.routes import admin
 from app.services.scheduler import plant_scheduler
+from app.services.influxdb import influxdb_service
+from app.services.ai_engine import ai_engine
+from app.services.moltbook import moltbook_service
+from app.services.tts import tts_service
 from app.config import settings
+from app.utils.cors import OpenCORSMiddleware
+import orjson
 import logging
 
 # Setup logging
@@ -27,9 +33,11 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown
     logger.info("Shutting down Plant Voice Labs Backend...")
-    plant_scheduler.stop()
-    from app.services.influxdb import influxdb_service
+    await plant_scheduler.astop()
     influxdb_service.close()
+    await ai_engine.aclose()
+    await moltbook_service.aclose()
+    await tts_service.aclose()
     logger.info("Shutdown complete")
 
 # Create FastAPI app
@@ -37,17 +45,12 @@ app = FastAPI(
     title="Plant Voice Labs IoT Gateway",
     description="Backend API for Plant Voice Labs sensor data ingestion, AI interpretation, and text-to-speech",
     version="3.1.0",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
-# CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+# CORS (allow all origins, methods and headers, with credentials)
+app.add_middleware(OpenCORSMiddleware)
 
 # Include routers
 app.include_router(sensors.router)
@@ -56,18 +59,21 @@ app.include_router(speech.router)
 app.include_router(dashboard.router)
 app.include_router(admin.router)
 
+# Static root payload, serialized once
+ROOT_BODY = orjson.dumps({
+    "message": "Plant Voice Labs IoT Gateway",
+    "version": "3.1.0",
+    "status": "operational",
+    "features": [
+        "IoT Sensor Data Ingestion",
+        "AI Plant Interpretation",
+        "Text-to-Speech",
+        "Scheduled Messages",
+        "Live Dashboard API",
+        "Growth Phase Management"
+    ]
+})
+
 @app.get("/")
 async def root():
-    return {
-        "message": "Plant Voice Labs IoT Gateway",
-        "version": "3.1.0",
-        "status": "operational",
-        "features": [
-            "IoT Sensor Data Ingestion",
-            "AI Plant Interpretation",
-            "Text-to-Speech",
-            "Scheduled Messages",
-            "Live Dashboard API",
-            "Growth Phase Management"
-        ]
-    }
\ No newline at end of file
+    return Response(content=ROOT_BODY, media_type="application/json")
\ No newline at end of file
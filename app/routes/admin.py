@@ -1,7 +1,14 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from pydantic import BaseModel
 from typing import Optional
+from datetime import datetime
+from app.services.growth_phase import get_current_phase as load_current_phase, get_all_phases, update_phase as do_update
+from app.services.influxdb import influxdb_service
+from app.schemas import SensorPayload, SensorData, SensorReading
+from zoneinfo import ZoneInfo
 import os
+import hmac
+import orjson
 import logging
 
 logger = logging.getLogger(__name__)
@@ -10,49 +17,56 @@ router = APIRouter(prefix="/api/v1/admin", tags=["admin"])
 
 # Password dari environment variable
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "plantvoice-default-change-me")
+ADMIN_PASSWORD_BYTES = ADMIN_PASSWORD.encode()
+
+JAKARTA_TZ = ZoneInfo('Asia/Jakarta')
 
 class PhaseUpdateRequest(BaseModel):
     phase: str
     password: str
 
+# Serialized /current-phase body, rebuilt whenever the cached phase object changes
+_phase_body_cache = {"phase": None, "body": b""}
+
 @router.get("/current-phase")
 async def get_current_phase():
     """Get current growth phase (public endpoint)"""
-    from app.services.growth_phase import get_current_phase, get_all_phases
+    phase = load_current_phase()
     
-    phase = get_current_phase()
-    return {
-        "success": True,
-        "phase": phase["name"],
-        "updated_at": phase["updated_at"],
-        "duration_days": phase["duration_days"],
-        "optimal_ranges": {
-            "temperature": phase["temperature"],
-            "humidity": phase["humidity"],
-            "light": phase["light"],
-            "soil_moisture": phase["soil_moisture"]
-        },
-        "description": phase["description"],
-        "physiological_processes": phase["physiological_processes"],
-        "visual_indicators": phase["visual_indicators"],
-        "transition_signs": phase["transition_signs"],
-        "common_problems": phase["common_problems"],
-        "tips": phase["tips"],
-        "available_phases": get_all_phases()
-    }
+    if _phase_body_cache["phase"] is not phase:
+        _phase_body_cache["body"] = orjson.dumps({
+            "success": True,
+            "phase": phase["name"],
+            "updated_at": phase["updated_at"],
+            "duration_days": phase["duration_days"],
+            "optimal_ranges": {
+                "temperature": phase["temperature"],
+                "humidity": phase["humidity"],
+                "light": phase["light"],
+                "soil_moisture": phase["soil_moisture"]
+            },
+            "description": phase["description"],
+            "physiological_processes": phase["physiological_processes"],
+            "visual_indicators": phase["visual_indicators"],
+            "transition_signs": phase["transition_signs"],
+            "common_problems": phase["common_problems"],
+            "tips": phase["tips"],
+            "available_phases": get_all_phases()
+        })
+        _phase_body_cache["phase"] = phase
+    
+    return Response(content=_phase_body_cache["body"], media_type="application/json")
 
 @router.post("/update-phase")
 async def update_phase(request: PhaseUpdateRequest):
     """Update growth phase (requires password)"""
     
     # Verify password
-    if request.password != ADMIN_PASSWORD:
+    if not hmac.compare_digest(request.password.encode(), ADMIN_PASSWORD_BYTES):
         logger.warning("Invalid password attempt for phase update")
         raise HTTPException(status_code=401, detail="Invalid password")
     
     # Validate and update phase
-    from app.services.growth_phase import update_phase as do_update, get_all_phases
-    
     valid_phases = get_all_phases()
     if request.phase not in valid_phases:
         raise HTTPException(
@@ -76,49 +90,49 @@ class ManualLightRequest(BaseModel):
     light_value: float
     password: str
 
+def _trusted_reading(reading: Optional[dict], default_value: float, default_unit: str) -> SensorReading:
+    """Build a SensorReading from trusted data without running validation"""
+    if not reading:
+        reading = {"value": default_value, "unit": default_unit}
+    return SensorReading.model_construct(
+        value=float(reading["value"]),
+        unit=reading.get("unit", default_unit),
+        status=reading.get("status", "normal")
+    )
+
 @router.post("/manual-light")
 async def set_manual_light(request: ManualLightRequest):
     """Manually set light value when sensor is broken"""
     
     # Verify password
-    if request.password != ADMIN_PASSWORD:
+    if not hmac.compare_digest(request.password.encode(), ADMIN_PASSWORD_BYTES):
         logger.warning("Invalid password attempt for manual light input")
         raise HTTPException(status_code=401, detail="Invalid password")
     
     try:
-        from app.services.influxdb import influxdb_service
-        from app.schemas import SensorPayload
-        from datetime import datetime
-        import pytz
-        
         # Get current timestamp as Unix timestamp (seconds)
-        now = datetime.now(pytz.timezone('Asia/Jakarta'))
+        now = datetime.now(JAKARTA_TZ)
         unix_timestamp = int(now.timestamp())
         
         # Get latest sensor data for other sensors
-        from app.services.influxdb import influxdb_service
-        latest = influxdb_service.get_latest_readings("PVL-001")
+        latest = influxdb_service.get_latest_readings("PVL-001") or {}
         
-        # Create complete sensor data with manual light override
-        manual_data = {
-            "device_id": "PVL-001",
-            "timestamp": unix_timestamp,
-            "sensors": {
-                "temperature": latest.get("temperature", {"value": 27.0, "unit": "°C", "status": "normal"}),
-                "humidity": latest.get("humidity", {"value": 65.0, "unit": "%", "status": "normal"}),
-                "light": {
-                    "value": request.light_value,
-                    "unit": "lux",
-                    "status": "normal"
-                },
-                "soil_moisture": latest.get("soil_moisture", {"value": 65.0, "unit": "%", "status": "normal"}),
-                "tds": latest.get("tds", {"value": 0, "unit": "ppm", "status": "normal"}),
-                "ph": latest.get("ph", {"value": 0, "unit": "", "status": "normal"})
-            }
-        }
+        # Create complete sensor data with manual light override.
+        # Values are already known-good, so skip Pydantic validation.
+        payload = SensorPayload.model_construct(
+            device_id="PVL-001",
+            timestamp=unix_timestamp,
+            sensors=SensorData.model_construct(
+                temperature=_trusted_reading(latest.get("temperature"), 27.0, "°C"),
+                humidity=_trusted_reading(latest.get("humidity"), 65.0, "%"),
+                light=_trusted_reading(None, request.light_value, "lux"),
+                soil_moisture=_trusted_reading(latest.get("soil_moisture"), 65.0, "%"),
+                tds=_trusted_reading(latest.get("tds"), 0, "ppm"),
+                ph=_trusted_reading(latest.get("ph"), 0, "")
+            )
+        )
         
         # Write to InfluxDB
-        payload = SensorPayload(**manual_data)
         success = influxdb_service.write_sensor_data(payload)
         
         if not success:
@@ -1,10 +1,13 @@
 from fastapi import APIRouter, HTTPException, Header, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Dict, Optional
 from app.services.ai_engine import ai_engine
 from app.services.knowledge import knowledge_service
 from app.config import settings
+import hmac
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/ai", tags=["ai"])
@@ -25,14 +28,14 @@ async def get_plant_response(
     request: PlantQueryRequest,
     x_api_key: str = Header(None)
 ):
-    if x_api_key != settings.API_SECRET_KEY:
+    if not hmac.compare_digest(x_api_key.encode() if x_api_key else b"", settings.api_secret_key_bytes):
         logger.warning(f"Invalid API key attempt for AI endpoint")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid API key"
         )
     
-    result = ai_engine.generate_plant_response(
+    result = await ai_engine.agenerate_plant_response(
         plant_name=request.plant_name,
         sensor_data=request.sensor_data
     )
@@ -43,13 +46,43 @@ async def get_plant_response(
             detail=result.get("error", "Failed to generate response")
         )
     
-    return PlantQueryResponse(
+    # Fields come from our own engine output, so skip re-validation
+    return PlantQueryResponse.model_construct(
         success=True,
         plant=result.get("plant"),
         message=result.get("message"),
         analysis=result.get("analysis")
     )
 
+@router.post("/talk/stream")
+async def stream_plant_response(
+    request: PlantQueryRequest,
+    x_api_key: str = Header(None)
+):
+    """Stream the plant message as Server-Sent Events while it is generated"""
+    if not hmac.compare_digest(x_api_key.encode() if x_api_key else b"", settings.api_secret_key_bytes):
+        logger.warning("Invalid API key attempt for AI stream endpoint")
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid API key"
+        )
+    
+    async def events():
+        try:
+            async for chunk in ai_engine.astream_plant_response(request.plant_name, request.sensor_data):
+                yield b"data: " + orjson.dumps({"delta": chunk}) + b"\n\n"
+        except Exception as e:
+            logger.error(f"AI stream error: {e}")
+            yield b"event: error\ndata: " + orjson.dumps({"error": "Failed to get response from AI"}) + b"\n\n"
+            return
+        yield b"data: [DONE]\n\n"
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/plants")
 async def get_available_plants():
     plants = knowledge_service.get_available_plants()
@@ -1,13 +1,16 @@
 from fastapi import APIRouter, HTTPException, status
 from fastapi.responses import FileResponse
 from typing import Dict, Optional, List
-from datetime import datetime
-import pytz
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+import asyncio
+import random
 import logging
 
 from app.services.influxdb import influxdb_service
 from app.services.scheduler import plant_scheduler
 from app.services.tts import tts_service
+from app.services.growth_phase import get_current_phase, get_experiment_day, analyze_sensors
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/dashboard", tags=["dashboard"])
@@ -16,21 +19,27 @@ router = APIRouter(prefix="/api/v1/dashboard", tags=["dashboard"])
 DEVICE_ID = "PVL-001"
 PLANT_NAME = "eggplant"
 
-# Experiment start date 
-EXPERIMENT_START_DATE = datetime(2026, 1, 26, tzinfo=pytz.timezone('Asia/Jakarta'))
+JAKARTA_TZ = ZoneInfo('Asia/Jakarta')
 
-def get_experiment_day():
-    """Calculate current experiment day"""
-    now = datetime.now(pytz.timezone('Asia/Jakarta'))
-    delta = now - EXPERIMENT_START_DATE
-    return delta.days + 1
+# Sensors judged against the growth phase thresholds
+ANALYZED_SENSORS = ("temperature", "humidity", "light", "soil_moisture")
+SEVERITY_RANK = {"normal": 0, "warning": 1, "critical": 2}
+
+VALID_MESSAGE_TYPES = frozenset({"greeting_morning", "greeting_night", "report"})
+VALID_HISTORY_HOURS = frozenset({24, 168, 720})
 
 @router.get("/sensors")
 async def get_current_sensors():
     """Get current sensor readings from ESP32"""
-    from app.services.growth_phase import get_current_phase, analyze_sensor_for_phase
+    now = datetime.now(JAKARTA_TZ)
+    
+    # Start the InfluxDB read off the event loop while loading the phase
+    sensor_task = asyncio.create_task(asyncio.to_thread(influxdb_service.get_latest_readings, DEVICE_ID))
     
-    sensor_data = influxdb_service.get_latest_readings(DEVICE_ID)
+    # Get current growth phase
+    phase = get_current_phase()
+    
+    sensor_data = await sensor_task
     
     if not sensor_data:
         # Return mock data if ESP32 not connected
@@ -46,34 +55,27 @@ async def get_current_sensors():
     else:
         is_live = True
     
-    # Get current growth phase
-    phase = get_current_phase()
-    
     # Analyze sensors based on current growth phase
-    phase_analysis = {}
-    sensor_keys = ["temperature", "humidity", "light", "soil_moisture"]
-    
-    for key in sensor_keys:
-        if key in sensor_data and sensor_data[key].get("value") is not None:
-            value = sensor_data[key]["value"]
-            phase_analysis[key] = analyze_sensor_for_phase(key, value)
+    readings = {}
+    for key in ANALYZED_SENSORS:
+        reading = sensor_data.get(key)
+        readings[key] = reading.get("value") if reading else None
+    phase_analysis = analyze_sensors(readings, phase["name"])
     
     # Calculate overall severity
-    severities = [s.get("severity", "normal") for s in phase_analysis.values()]
-    if "critical" in severities:
-        overall_severity = "critical"
-    elif "warning" in severities:
-        overall_severity = "warning"
-    else:
-        overall_severity = "normal"
+    overall_severity = max(
+        (s.get("severity", "normal") for s in phase_analysis.values()),
+        key=SEVERITY_RANK.__getitem__,
+        default="normal"
+    )
     
     return {
         "success": True,
         "is_live": is_live,
         "device_id": DEVICE_ID,
         "plant_name": PLANT_NAME,
-        "experiment_day": get_experiment_day(),
-        "timestamp": datetime.now(pytz.timezone('Asia/Jakarta')).isoformat(),
+        "experiment_day": get_experiment_day(now),
+        "timestamp": now.isoformat(),
         "sensors": sensor_data,
         "phase": {
             "name": phase["name"],
@@ -90,9 +92,7 @@ async def get_current_sensors():
 async def get_latest_message():
     """Get latest AI message and audio"""
     
-    message = plant_scheduler.get_latest_message()
-    is_sleeping = plant_scheduler.is_sleeping_time()
-    next_update = plant_scheduler.get_next_update_time()
+    message, is_sleeping, next_update = plant_scheduler.get_snapshot()
     
     if not message:
         return {
@@ -127,7 +127,7 @@ async def get_sensor_history(hours: int = 24):
     """Get sensor history for charts"""
     
     # Validate hours parameter (24h, 7d=168h, 30d=720h)
-    if hours not in [24, 168, 720]:
+    if hours not in VALID_HISTORY_HOURS:
         hours = 24
     
     history = influxdb_service.get_readings_history(DEVICE_ID, hours)
@@ -240,12 +240,13 @@ async def trigger_insight_generation(insight_type: str = "daily"):
 async def get_dashboard_status():
     """Get overall dashboard status"""
     
-    is_sleeping = plant_scheduler.is_sleeping_time()
-    next_update = plant_scheduler.get_next_update_time()
-    latest_message = plant_scheduler.get_latest_message()
+    # Start the InfluxDB read off the event loop while reading scheduler state
+    sensor_task = asyncio.create_task(asyncio.to_thread(influxdb_service.get_latest_readings, DEVICE_ID))
+    
+    latest_message, is_sleeping, next_update = plant_scheduler.get_snapshot()
     
     # Check if ESP32 is connected (has recent data)
-    sensor_data = influxdb_service.get_latest_readings(DEVICE_ID)
+    sensor_data = await sensor_task
     esp32_connected = sensor_data is not None
     
     return {
@@ -263,7 +264,7 @@ async def get_dashboard_status():
 async def trigger_message_manually(message_type: str = "report"):
     """Manually trigger AI message generation (for testing)"""
     
-    if message_type not in ["greeting_morning", "greeting_night", "report"]:
+    if message_type not in VALID_MESSAGE_TYPES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid message type. Use: greeting_morning, greeting_night, or report"
@@ -294,101 +295,60 @@ async def trigger_message_manually(message_type: str = "report"):
         }
     }
 
+# (sensor, base, spread, decimals) used to fake readings for the demo chart
+MOCK_HISTORY_RANGES = (
+    ("temperature", 25, 5, 1),
+    ("humidity", 60, 15, 1),
+    ("soil_moisture", 65, 15, 1),
+    ("light", 15000, 10000, 0),
+    ("ph", 6.0, 0.8, 1),
+    ("tds", 900, 400, 0)
+)
+
 def _generate_mock_history(hours: int) -> Dict:
     """Generate mock history data for demo"""
-    import random
+    now = datetime.now(JAKARTA_TZ)
+    rand = random.random
     
     data = {
-        "labels": [],
-        "temperature": [],
-        "humidity": [],
-        "soil_moisture": [],
-        "light": [],
-        "ph": [],
-        "tds": []
+        "labels": [f"{(now.hour - i) % 24:02d}:00" for i in range(hours, 0, -1)]
     }
     
-    now = datetime.now(pytz.timezone('Asia/Jakarta'))
-    
-    for i in range(hours, 0, -1):
-        hour = now.hour - i
-        if hour < 0:
-            hour += 24
-        data["labels"].append(f"{hour:02d}:00")
-        
-        data["temperature"].append(round(25 + random.random() * 5, 1))
-        data["humidity"].append(round(60 + random.random() * 15, 1))
-        data["soil_moisture"].append(round(65 + random.random() * 15, 1))
-        data["light"].append(round(15000 + random.random() * 10000, 0))
-        data["ph"].append(round(6.0 + random.random() * 0.8, 1))
-        data["tds"].append(round(900 + random.random() * 400, 0))
+    for sensor, base, spread, decimals in MOCK_HISTORY_RANGES:
+        data[sensor] = [round(base + rand() * spread, decimals) for _ in range(hours)]
     
     return data
 
+# Sensor order of the history chart series
+HISTORY_SENSORS = ("temperature", "humidity", "soil_moisture", "light", "ph", "tds")
+
 def _organize_history(history: List[Dict]) -> Dict:
-    """Organize raw history data by sensor type"""
-    from datetime import datetime
-    import pytz
-    
-    data = {
-        "labels": [],
-        "temperature": [],
-        "humidity": [],
-        "soil_moisture": [],
-        "light": [],
-        "ph": [],
-        "tds": []
-    }
-    
-    jakarta_tz = pytz.timezone('Asia/Jakarta')
-    utc_tz = pytz.UTC
-    
-    # Group by time
-    time_groups = {}
-    for record in history:
-        time_str = record.get("time", "")
-        sensor = record.get("sensor_type")
-        value = record.get("value")
+    """Convert pivoted history rows into chart labels and per-sensor series"""
+    data = {"labels": []}
+    for sensor in HISTORY_SENSORS:
+        data[sensor] = []
+    
+    # Rows arrive sorted by time, one per aggregation window
+    for row in history:
+        time_str = row.get("time", "")
         
         # Convert UTC to Jakarta timezone
         try:
-            if time_str:
-                # Parse UTC time
-                if time_str.endswith('Z'):
-                    time_str = time_str[:-1]
-                utc_time = datetime.fromisoformat(time_str)
-                if utc_time.tzinfo is None:
-                    utc_time = utc_tz.localize(utc_time)
-                # Convert to Jakarta
-                jakarta_time = utc_time.astimezone(jakarta_tz)
-                time_key = jakarta_time.strftime("%Y-%m-%dT%H:%M")
-            else:
-                continue
+            if time_str.endswith('Z'):
+                time_str = time_str[:-1]
+            utc_time = datetime.fromisoformat(time_str)
+            if utc_time.tzinfo is None:
+                utc_time = utc_time.replace(tzinfo=timezone.utc)
+            jakarta_time = utc_time.astimezone(JAKARTA_TZ)
         except Exception as e:
             logger.error(f"Failed to parse time: {time_str}, error: {e}")
             continue
         
-        if time_key not in time_groups:
-            time_groups[time_key] = {}
-        time_groups[time_key][sensor] = value
-    
-    # Convert to arrays
-    for time_key in sorted(time_groups.keys()):
         # Format label as DD/MM HH:MM for better readability
-        try:
-            dt = datetime.fromisoformat(time_key)
-            label = dt.strftime("%d/%m %H:%M")
-        except:
-            label = time_key[11:16] if len(time_key) > 11 else time_key
+        data["labels"].append(jakarta_time.strftime("%d/%m %H:%M"))
         
-        data["labels"].append(label)
-        
-        sensors = time_groups[time_key]
-        data["temperature"].append(sensors.get("temperature", 0))
-        data["humidity"].append(sensors.get("humidity", 0))
-        data["soil_moisture"].append(sensors.get("soil_moisture", 0))
-        data["light"].append(sensors.get("light", 0))
-        data["ph"].append(sensors.get("ph", 0))
-        data["tds"].append(sensors.get("tds", 0))
-    
-    return data
\ No newline at end of file
+        for sensor in HISTORY_SENSORS:
+            value = row.get(sensor)
+            data[sensor].append(value if value is not None else 0)
+    
+    return data
@@ -1,19 +1,25 @@
-from fastapi import APIRouter, HTTPException, Header, status
+from fastapi import APIRouter, HTTPException, Header, Response, status
 from app.schemas import SensorPayload
 from app.services.influxdb import influxdb_service
+from app.services.scheduler import plant_scheduler
 from app.config import settings
+import hmac
+import orjson
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/v1/sensors", tags=["sensors"])
 
+# Authorized devices (frozenset, parsed once from settings)
+DEVICE_WHITELIST = settings.device_whitelist
+
 @router.post("/data", status_code=status.HTTP_201_CREATED)
 async def receive_sensor_data(
     payload: SensorPayload,
     x_api_key: str = Header(None)
 ):
     # Authentication: Check API Key
-    if x_api_key != settings.API_SECRET_KEY:
+    if not hmac.compare_digest(x_api_key.encode() if x_api_key else b"", settings.api_secret_key_bytes):
         logger.warning(f"Invalid API key attempt from device {payload.device_id}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -21,7 +27,7 @@ async def receive_sensor_data(
         )
     
     # Authorization: Check device whitelist
-    if payload.device_id not in settings.device_whitelist:
+    if payload.device_id not in DEVICE_WHITELIST:
         logger.warning(f"Unauthorized device attempt: {payload.device_id}")
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -37,12 +43,18 @@ async def receive_sensor_data(
             detail="Failed to write to database"
         )
     
+    # Fresh readings supersede whatever the scheduler cached for this device
+    plant_scheduler.invalidate_sensor_cache(payload.device_id)
+    
     return {
         "status": "success",
         "message": f"Data received from {payload.device_id}",
         "timestamp": payload.timestamp
     }
 
+# Static health payload, serialized once
+HEALTH_BODY = orjson.dumps({"status": "healthy", "service": "Plant Voice Labs IoT Gateway"})
+
 @router.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "Plant Voice Labs IoT Gateway"}
\ No newline at end of file
+    return Response(content=HEALTH_BODY, media_type="application/json")
\ No newline at end of file
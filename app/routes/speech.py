@@ -5,6 +5,7 @@ from typing import Dict, Optional
 from app.services.ai_engine import ai_engine
 from app.services.tts import tts_service
 from app.config import settings
+import hmac
 import logging
 
 logger = logging.getLogger(__name__)
@@ -27,7 +28,7 @@ async def generate_plant_speech(
     request: SpeakRequest,
     x_api_key: str = Header(None)
 ):
-    if x_api_key != settings.API_SECRET_KEY:
+    if not hmac.compare_digest(x_api_key.encode() if x_api_key else b"", settings.api_secret_key_bytes):
         logger.warning("Invalid API key attempt for speech endpoint")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -35,7 +36,7 @@ async def generate_plant_speech(
         )
     
     # Get AI response first
-    ai_result = ai_engine.generate_plant_response(
+    ai_result = await ai_engine.agenerate_plant_response(
         plant_name=request.plant_name,
         sensor_data=request.sensor_data
     )
@@ -49,7 +50,7 @@ async def generate_plant_speech(
     text_response = ai_result.get("message")
     
     # Generate speech from text
-    audio_filename = tts_service.generate_speech(text_response)
+    audio_filename = await tts_service.agenerate_speech(text_response)
     
     if not audio_filename:
         raise HTTPException(
@@ -57,7 +58,8 @@ async def generate_plant_speech(
             detail="Failed to generate speech audio"
         )
     
-    return SpeakResponse(
+    # Fields come from our own engine output, so skip re-validation
+    return SpeakResponse.model_construct(
         success=True,
         plant=ai_result.get("plant"),
         text=text_response,
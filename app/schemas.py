@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field, validator
-from typing import Literal
+from pydantic import BaseModel, Field, StringConstraints
+from typing import Annotated, Literal
 
 class SensorReading(BaseModel):
     value: float
@@ -14,13 +14,10 @@ class SensorData(BaseModel):
     tds: SensorReading
     ph: SensorReading
 
+# Must start with PVL-, max 50 chars; checked by pydantic-core's compiled regex
+DeviceId = Annotated[str, StringConstraints(pattern=r'^PVL-[A-Za-z0-9_-]{0,46}$')]
+
 class SensorPayload(BaseModel):
-    device_id: str = Field(..., min_length=3, max_length=50)
+    device_id: DeviceId
     timestamp: int = Field(..., gt=0)
-    sensors: SensorData
-    
-    @validator('device_id')
-    def validate_device_id(cls, v):
-        if not v.startswith('PVL-'):
-            raise ValueError('device_id must start with PVL-')
-        return v
\ No newline at end of file
+    sensors: SensorData
\ No newline at end of file
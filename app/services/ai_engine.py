@@ -1,59 +1,255 @@
+import asyncio
+import hashlib
 import httpx
 import logging
-from typing import Dict
+import orjson
+import random
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from app.config import settings
+from app.services.growth_phase import get_current_phase, get_phase_info, analyze_sensors
 
 logger = logging.getLogger(__name__)
 
+# Max OpenRouter requests in flight at once; extra callers wait their turn
+OPENROUTER_CONCURRENCY = 8
+
+# Completed responses are reused for identical prompts for a few minutes
+RESPONSE_CACHE_TTL_SECONDS = 300
+RESPONSE_CACHE_MAX_SIZE = 512
+
+# Plant messages are reused while every sensor stays in the same status bucket
+STATUS_CACHE_TTL_SECONDS = 600
+
+# Retry 429/5xx/network errors with jittered exponential backoff
+OPENROUTER_MAX_ATTEMPTS = 4
+OPENROUTER_BACKOFF_INITIAL = 0.25
+OPENROUTER_BACKOFF_MAX = 8.0
+
+# After this many failed calls in a row, stop calling OpenRouter for a while
+CIRCUIT_FAIL_MAX = 5
+CIRCUIT_RESET_SECONDS = 30
+
+# How long a successful message stays usable as the open-circuit fallback
+LAST_GOOD_TTL_SECONDS = 24 * 60 * 60
+
+# Routine plant messages go to the faster tier; critical conditions keep Sonnet
+FAST_MODEL = "anthropic/claude-haiku-4.5"
+
+# Plant messages are 2-4 sentences; insights keep the default 1024 budget
+PLANT_MESSAGE_MAX_TOKENS = 220
+
+# Sensors that go into the plant voice prompt
+PROMPT_SENSORS = ("temperature", "humidity", "light", "soil_moisture")
+EMPTY_READING = {}
+
+def _extract_sensor_values(sensor_data: Dict) -> Dict:
+    """Pull the raw value of each prompt sensor (None when missing)"""
+    return {key: (sensor_data.get(key) or EMPTY_READING).get("value") for key in PROMPT_SENSORS}
+
+READINGS_TEMPLATE = """## CURRENT READINGS
+Temperature: {temperature}°C - {temperature_status}: {temperature_message}
+Humidity: {humidity}% - {humidity_status}: {humidity_message}
+Light: {light} lux - {light_status}: {light_message}
+Soil Moisture: {soil_moisture}% - {soil_moisture_status}: {soil_moisture_message}
+
+"""
+
+MESSAGE_CONTEXTS = {
+    "greeting_morning": """This is a MORNING GREETING (6:00 AM). 
+Start by saying good morning and express how you feel waking up. 
+Mention your current growth phase and how you are developing.
+Be cheerful and optimistic about the new day.""",
+    "greeting_night": """This is a NIGHT GREETING (10:00 PM). 
+Say good night and summarize how your day was based on the conditions.
+Mention your growth phase and any progress you made today.
+Be calm and peaceful, ready to rest.""",
+    "report": """This is a REGULAR STATUS REPORT. 
+Share your current condition based on the sensor readings.
+Mention what phase you are in and how you are developing.
+Be conversational and helpful, like talking to a caring friend."""
+}
+
+def _format_thresholds(thresholds: Dict) -> str:
+    return (
+        f"{thresholds.get('critical_low')} / {thresholds.get('low')} / "
+        f"{thresholds.get('optimal_min')}-{thresholds.get('optimal_max')} / "
+        f"{thresholds.get('high')} / {thresholds.get('critical_high')}"
+    )
+
+def _escape_braces(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
+
+@lru_cache(maxsize=32)
+def _phase_prompt_template(phase_name: str, message_type: str) -> str:
+    """Pre-render the prompt for a phase and message type, leaving only reading placeholders"""
+    header, footer = _phase_prompt_blocks(phase_name, message_type)
+    return _escape_braces(header) + READINGS_TEMPLATE + _escape_braces(footer)
+
+def _phase_prompt_blocks(phase_name: str, message_type: str) -> Tuple[str, str]:
+    """Build the static (header, footer) prompt text for a phase and message type"""
+    phase = get_phase_info(phase_name)
+    
+    # Get threshold info for context
+    temp_thresholds = phase.get("temperature", {})
+    humidity_thresholds = phase.get("humidity", {})
+    light_thresholds = phase.get("light", {})
+    soil_thresholds = phase.get("soil_moisture", {})
+    
+    # Context based on message type
+    context = MESSAGE_CONTEXTS.get(message_type, MESSAGE_CONTEXTS["report"])
+    
+    header = f"""You are an eggplant plant that can speak naturally. Generate a friendly, conversational message about your current condition.
+
+## GROWTH PHASE: {phase_name.upper()}
+Description: {phase["description"]}
+Processes: {phase.get("physiological_processes", "N/A")}
+Visual indicators: {phase.get("visual_indicators", "N/A")}
+Transition signs: {phase.get("transition_signs", "N/A")}
+Care tips: {phase.get("tips", "N/A")}
+
+## RANGES FOR THIS PHASE (critical low / low / optimal / high / critical high)
+Temperature °C: {_format_thresholds(temp_thresholds)}
+Humidity %: {_format_thresholds(humidity_thresholds)}
+Light lux: {_format_thresholds(light_thresholds)}
+Soil moisture %: {_format_thresholds(soil_thresholds)}
+
+"""
+    
+    footer = f"""## MESSAGE TYPE
+{context}
+
+## RULES
+- Speak as the plant in first person, naturally, like a friendly chat rather than a report.
+- Judge every condition against the {phase_name} phase ranges.
+- optimal = happy; slightly_low/high = mention gently; low/high = soft suggestion; critical_low/high = express discomfort and ask for help.
+- 2-4 sentences maximum, no emojis, no jargon or exact numbers unless necessary ("I am feeling warm", not "Temperature is 32 degrees").
+- If everything is optimal, simply express happiness and gratitude.
+
+Now generate the plant voice message:"""
+    
+    return header, footer
+
+def _is_retriable(error: Exception) -> bool:
+    """Rate limits, server errors and network failures are worth another try"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code == 429 or error.response.status_code >= 500
+    return isinstance(error, httpx.TransportError)
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Seconds requested by a 429 Retry-After header, capped at the backoff maximum"""
+    if not isinstance(error, httpx.HTTPStatusError) or error.response.status_code != 429:
+        return None
+    try:
+        return min(OPENROUTER_BACKOFF_MAX, max(0.0, float(error.response.headers["retry-after"])))
+    except (KeyError, ValueError):
+        return None
+
+def _format_described(title: str, items: list) -> str:
+    """Render a titled bullet list of item descriptions, or "" when there are none"""
+    if not items:
+        return ""
+    return title + "\n" + "".join(f"  - {item.get('description', '')}\n" for item in items)
+
 class AIEngine:
     def __init__(self):
         self.api_key = settings.OPENROUTER_API_KEY
         self.base_url = "https://openrouter.ai/api/v1/chat/completions"
         self.model = "anthropic/claude-sonnet-4"
+        self.fast_model = FAST_MODEL
+        
+        # One pooled client so TCP/TLS connections to OpenRouter are reused
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=60.0),
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json",
+                "HTTP-Referer": "https://plantvoicelabs.com",
+                "X-Title": "Plant Voice Labs"
+            }
+        )
+        self.request_slots = asyncio.Semaphore(OPENROUTER_CONCURRENCY)
+        
+        # LRUs of key -> (expires_at, content): exact prompt hash, and status buckets
+        self.response_cache = OrderedDict()
+        self.status_cache = OrderedDict()
+        
+        # status key -> future of the OpenRouter call currently generating that message
+        self.inflight = {}
+        
+        # Circuit breaker state
+        self.consecutive_failures = 0
+        self.circuit_open_until = 0.0
+        
+        # (plant_name, message_type) -> last successful message, served while the circuit is open
+        self.last_good_messages = OrderedDict()
+    
+    async def aclose(self):
+        await self.client.aclose()
     
-    def generate_plant_response(self, plant_name: str, sensor_data: Dict) -> Dict:
-        return self._generate_response(plant_name, sensor_data, message_type="report")
+    async def agenerate_plant_response(self, plant_name: str, sensor_data: Dict) -> Dict:
+        return await self._generate_response(plant_name, sensor_data, message_type="report")
     
-    def generate_plant_response_scheduled(self, plant_name: str, sensor_data: Dict, message_type: str) -> Dict:
-        return self._generate_response(plant_name, sensor_data, message_type=message_type)
+    async def agenerate_plant_response_scheduled(self, plant_name: str, sensor_data: Dict, message_type: str) -> Dict:
+        return await self._generate_response(plant_name, sensor_data, message_type=message_type)
     
-    def _generate_response(self, plant_name: str, sensor_data: Dict, message_type: str = "report") -> Dict:
+    async def agenerate_batch(self, plants: List[Tuple[str, Dict]], message_type: str) -> List[Dict]:
+        """Generate messages for many (plant_name, sensor_data) pairs concurrently"""
+        # Submit everything first; request_slots bounds how many hit OpenRouter at once
+        results = await asyncio.gather(
+            *(self._generate_response(plant_name, sensor_data, message_type=message_type) for plant_name, sensor_data in plants),
+            return_exceptions=True
+        )
+        return [
+            {"success": False, "error": str(result)} if isinstance(result, BaseException) else result
+            for result in results
+        ]
+    
+    async def _generate_response(self, plant_name: str, sensor_data: Dict, message_type: str = "report") -> Dict:
         try:
-            # Get current growth phase and analyze sensors
-            from app.services.growth_phase import get_current_phase, analyze_sensor_for_phase
-            
-            phase = get_current_phase()
-            
-            # Get sensor values
-            sensor_values = {
-                "temperature": sensor_data.get("temperature", {}).get("value"),
-                "humidity": sensor_data.get("humidity", {}).get("value"),
-                "light": sensor_data.get("light", {}).get("value"),
-                "soil_moisture": sensor_data.get("soil_moisture", {}).get("value")
-            }
-            
-            # Analyze each sensor based on current phase
-            phase_analysis = {}
-            for sensor_name, value in sensor_values.items():
-                if value is not None:
-                    phase_analysis[sensor_name] = analyze_sensor_for_phase(sensor_name, value)
-            
-            # Build prompt with phase context
-            prompt = self._build_prompt_with_phase(
-                plant_name, 
-                sensor_data, 
-                phase, 
-                phase_analysis, 
-                message_type
-            )
-            
-            response = self._call_openrouter(prompt)
+            phase, sensor_values, phase_analysis, overall_severity, status_key = self._analyze(plant_name, sensor_data, message_type)
+            response = self._cache_get(self.status_cache, status_key)
             
             if response is None:
-                return {
-                    "success": False,
-                    "error": "Failed to get response from AI"
-                }
+                # Concurrent callers with the same status key share one OpenRouter call
+                pending = self.inflight.get(status_key)
+                if pending is not None:
+                    response = await asyncio.shield(pending)
+                else:
+                    pending = asyncio.get_running_loop().create_future()
+                    self.inflight[status_key] = pending
+                    try:
+                        # Build prompt with phase context
+                        prompt = self._build_prompt_with_phase(
+                            plant_name, 
+                            sensor_values, 
+                            phase, 
+                            phase_analysis, 
+                            message_type
+                        )
+                        
+                        response = await self._call_openrouter(prompt, self._model_for(overall_severity), PLANT_MESSAGE_MAX_TOKENS)
+                    finally:
+                        del self.inflight[status_key]
+                        pending.set_result(response)
+                
+                if response is not None:
+                    self._cache_put(self.status_cache, status_key, response, STATUS_CACHE_TTL_SECONDS)
+                    self._cache_put(self.last_good_messages, (plant_name, message_type), response, LAST_GOOD_TTL_SECONDS)
+                elif self.circuit_is_open():
+                    # Keep the plant talking with its last message while OpenRouter is down
+                    response = self._cache_get(self.last_good_messages, (plant_name, message_type))
+                    if response is not None:
+                        logger.warning(f"Serving last good {message_type} message for {plant_name}")
+                
+                if response is None:
+                    return {
+                        "success": False,
+                        "error": "Failed to get response from AI"
+                    }
             
             return {
                 "success": True,
@@ -62,7 +258,7 @@ class AIEngine:
                 "analysis": {
                     "phase": phase["name"],
                     "sensors": phase_analysis,
-                    "overall_severity": self._get_overall_severity(phase_analysis)
+                    "overall_severity": overall_severity
                 },
                 "message": response
             }
@@ -74,190 +270,209 @@ class AIEngine:
                 "error": str(e)
             }
     
-    def _call_openrouter(self, prompt: str) -> str:
+    async def astream_plant_response(self, plant_name: str, sensor_data: Dict, message_type: str = "report") -> AsyncIterator[str]:
+        """Yield the plant message as it is generated; raises if OpenRouter fails"""
+        phase, sensor_values, phase_analysis, overall_severity, status_key = self._analyze(plant_name, sensor_data, message_type)
+        
+        cached = self._cache_get(self.status_cache, status_key)
+        if cached is not None:
+            yield cached
+            return
+        
+        # Same breaker as the non-streaming path: no live call while OpenRouter is known to be down
+        if self.circuit_is_open():
+            fallback = self._cache_get(self.last_good_messages, (plant_name, message_type))
+            if fallback is None:
+                raise RuntimeError("OpenRouter circuit open")
+            logger.warning(f"Serving last good {message_type} message for {plant_name}")
+            yield fallback
+            return
+        
+        prompt = self._build_prompt_with_phase(plant_name, sensor_values, phase, phase_analysis, message_type)
+        
+        # No retries here: once chunks have gone out, a replay would duplicate them
+        chunks = []
         try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "https://plantvoicelabs.com",
-                "X-Title": "Plant Voice Labs"
-            }
-            
-            payload = {
-                "model": self.model,
-                "messages": [
-                    {"role": "user", "content": prompt}
-                ],
-                "max_tokens": 1024
-            }
-            
-            with httpx.Client(timeout=30.0) as client:
-                response = client.post(
-                    self.base_url,
-                    headers=headers,
-                    json=payload
-                )
-                response.raise_for_status()
-                
-                data = response.json()
-                return data["choices"][0]["message"]["content"]
+            async for chunk in self._call_openrouter_stream(prompt, self._model_for(overall_severity), PLANT_MESSAGE_MAX_TOKENS):
+                chunks.append(chunk)
+                yield chunk
+        except Exception:
+            self._record_failure()
+            raise
         
-        except Exception as e:
-            logger.error(f"OpenRouter API error: {e}")
-            return None
+        # Only a fully received reply is worth caching
+        self.consecutive_failures = 0
+        response = "".join(chunks)
+        self._cache_put(self.response_cache, hashlib.sha256(prompt.encode()).digest(), response, RESPONSE_CACHE_TTL_SECONDS)
+        self._cache_put(self.status_cache, status_key, response, STATUS_CACHE_TTL_SECONDS)
+        self._cache_put(self.last_good_messages, (plant_name, message_type), response, LAST_GOOD_TTL_SECONDS)
     
-    def _build_prompt_with_phase(self, plant_name: str, sensor_data: Dict, phase: Dict, phase_analysis: Dict, message_type: str) -> str:
+    def _analyze(self, plant_name: str, sensor_data: Dict, message_type: str) -> Tuple:
+        """Return (phase, sensor_values, phase_analysis, overall_severity, status_key)"""
+        # Get current growth phase (cached with a short TTL) and analyze sensors
+        phase = get_current_phase()
         
         # Get sensor values
-        temp = sensor_data.get("temperature", {}).get("value", "N/A")
-        humidity = sensor_data.get("humidity", {}).get("value", "N/A")
-        light = sensor_data.get("light", {}).get("value", "N/A")
-        soil = sensor_data.get("soil_moisture", {}).get("value", "N/A")
+        sensor_values = _extract_sensor_values(sensor_data)
         
-        # Get phase analysis status and messages
-        temp_analysis = phase_analysis.get("temperature", {})
-        humidity_analysis = phase_analysis.get("humidity", {})
-        light_analysis = phase_analysis.get("light", {})
-        soil_analysis = phase_analysis.get("soil_moisture", {})
+        # Analyze each sensor against the phase loaded above
+        phase_analysis = analyze_sensors(sensor_values, phase["name"])
         
-        # Get threshold info for context
-        temp_thresholds = phase.get("temperature", {})
-        humidity_thresholds = phase.get("humidity", {})
-        light_thresholds = phase.get("light", {})
-        soil_thresholds = phase.get("soil_moisture", {})
+        overall_severity = self._get_overall_severity(phase_analysis)
         
-        # Context based on message type
-        if message_type == "greeting_morning":
-            context = """This is a MORNING GREETING (6:00 AM). 
-Start by saying good morning and express how you feel waking up. 
-Mention your current growth phase and how you are developing.
-Be cheerful and optimistic about the new day."""
+        # Readings that land in the same status buckets get the same message
+        status_key = (
+            plant_name,
+            message_type,
+            phase["name"],
+            tuple((name, analysis.get("status")) for name, analysis in phase_analysis.items()),
+            overall_severity
+        )
         
-        elif message_type == "greeting_night":
-            context = """This is a NIGHT GREETING (10:00 PM). 
-Say good night and summarize how your day was based on the conditions.
-Mention your growth phase and any progress you made today.
-Be calm and peaceful, ready to rest."""
+        return phase, sensor_values, phase_analysis, overall_severity, status_key
+    
+    def _model_for(self, overall_severity: str) -> str:
+        return self.model if overall_severity == "critical" else self.fast_model
+    
+    def cache_size(self) -> int:
+        return len(self.response_cache) + len(self.status_cache)
+    
+    def clear_cache(self):
+        self.response_cache.clear()
+        self.status_cache.clear()
+    
+    def _cache_get(self, cache: OrderedDict, key) -> Optional[str]:
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        expires_at, content = entry
+        if expires_at < time.monotonic():
+            del cache[key]
+            return None
+        cache.move_to_end(key)
+        return content
+    
+    def _cache_put(self, cache: OrderedDict, key, content: str, ttl: float):
+        cache[key] = (time.monotonic() + ttl, content)
+        cache.move_to_end(key)
+        while len(cache) > RESPONSE_CACHE_MAX_SIZE:
+            cache.popitem(last=False)
+    
+    async def _call_openrouter(self, prompt: str, model: Optional[str] = None, max_tokens: int = 1024) -> str:
+        # Identical prompts (same phase, message type and readings) reuse the last answer
+        cache_key = hashlib.sha256(prompt.encode()).digest()
+        cached = self._cache_get(self.response_cache, cache_key)
+        if cached is not None:
+            logger.info("OpenRouter response served from cache")
+            return cached
         
-        else:
-            context = """This is a REGULAR STATUS REPORT. 
-Share your current condition based on the sensor readings.
-Mention what phase you are in and how you are developing.
-Be conversational and helpful, like talking to a caring friend."""
+        # Fail fast while OpenRouter is known to be down instead of piling up timeouts
+        if self.circuit_is_open():
+            logger.warning("OpenRouter circuit open, skipping call")
+            return None
         
-        prompt = f"""You are an eggplant plant that can speak naturally. Generate a friendly, conversational message about your current condition.
-
-═══════════════════════════════════════════════════════════════
-CRITICAL CONTEXT - CURRENT GROWTH PHASE: {phase["name"].upper()}
-═══════════════════════════════════════════════════════════════
-
-Phase Description: {phase["description"]}
-
-What is happening in this phase: {phase.get("physiological_processes", "N/A")}
-
-Visual indicators of this phase: {phase.get("visual_indicators", "N/A")}
-
-Signs of transitioning to next phase: {phase.get("transition_signs", "N/A")}
-
-Care tips: {phase.get("tips", "N/A")}
-
-═══════════════════════════════════════════════════════════════
-OPTIMAL RANGES FOR {phase["name"].upper()} PHASE (Research-Based)
-═══════════════════════════════════════════════════════════════
-
-TEMPERATURE:
-  - Critical Low (damage): {temp_thresholds.get("critical_low")}°C
-  - Low (suboptimal): {temp_thresholds.get("low")}°C
-  - Optimal Range: {temp_thresholds.get("optimal_min")} - {temp_thresholds.get("optimal_max")}°C
-  - High (stress): {temp_thresholds.get("high")}°C
-  - Critical High (damage): {temp_thresholds.get("critical_high")}°C
-
-HUMIDITY:
-  - Critical Low: {humidity_thresholds.get("critical_low")}%
-  - Low: {humidity_thresholds.get("low")}%
-  - Optimal Range: {humidity_thresholds.get("optimal_min")} - {humidity_thresholds.get("optimal_max")}%
-  - High: {humidity_thresholds.get("high")}%
-  - Critical High: {humidity_thresholds.get("critical_high")}%
-
-LIGHT:
-  - Critical Low: {light_thresholds.get("critical_low")} lux
-  - Low: {light_thresholds.get("low")} lux
-  - Optimal Range: {light_thresholds.get("optimal_min")} - {light_thresholds.get("optimal_max")} lux
-  - High: {light_thresholds.get("high")} lux
-  - Critical High: {light_thresholds.get("critical_high")} lux
-
-SOIL MOISTURE:
-  - Critical Low (wilting): {soil_thresholds.get("critical_low")}%
-  - Low: {soil_thresholds.get("low")}%
-  - Optimal Range: {soil_thresholds.get("optimal_min")} - {soil_thresholds.get("optimal_max")}%
-  - High: {soil_thresholds.get("high")}%
-  - Critical High (waterlogging): {soil_thresholds.get("critical_high")}%
-
-═══════════════════════════════════════════════════════════════
-CURRENT SENSOR READINGS AND ANALYSIS
-═══════════════════════════════════════════════════════════════
-
-Temperature: {temp}°C
-  → Status: {temp_analysis.get("status", "unknown")}
-  → Assessment: {temp_analysis.get("message", "N/A")}
-
-Humidity: {humidity}%
-  → Status: {humidity_analysis.get("status", "unknown")}
-  → Assessment: {humidity_analysis.get("message", "N/A")}
-
-Light: {light} lux
-  → Status: {light_analysis.get("status", "unknown")}
-  → Assessment: {light_analysis.get("message", "N/A")}
-
-Soil Moisture: {soil}%
-  → Status: {soil_analysis.get("status", "unknown")}
-  → Assessment: {soil_analysis.get("message", "N/A")}
-
-═══════════════════════════════════════════════════════════════
-MESSAGE TYPE
-═══════════════════════════════════════════════════════════════
-{context}
-
-═══════════════════════════════════════════════════════════════
-IMPORTANT RULES FOR GENERATING THE MESSAGE
-═══════════════════════════════════════════════════════════════
-
-1. Speak as the plant in FIRST PERSON (I, me, my)
-2. Be NATURAL and CONVERSATIONAL - like a friendly chat, not a report
-3. JUDGE ALL CONDITIONS BASED ON THE CURRENT PHASE - what is optimal for {phase["name"]} phase
-4. For {phase["name"]} phase specifically: {phase["description"]}
-5. Status meanings:
-   - "optimal" = Condition is perfect, express happiness
-   - "slightly_low" or "slightly_high" = Minor concern, mention gently
-   - "low" or "high" = Needs attention, give soft suggestion
-   - "critical_low" or "critical_high" = Urgent, express discomfort and ask for help
-6. Keep the message to 2-4 sentences MAXIMUM
-7. Do NOT use emojis
-8. Do NOT use technical jargon like "lux", "percentage", or exact numbers unless necessary
-9. Speak naturally like "I am feeling warm" instead of "Temperature is 32 degrees"
-10. If ALL conditions are optimal, simply express happiness and gratitude
-
-═══════════════════════════════════════════════════════════════
-
-Now generate the plant voice message:"""
+        for attempt in range(1, OPENROUTER_MAX_ATTEMPTS + 1):
+            try:
+                content = "".join([chunk async for chunk in self._call_openrouter_stream(prompt, model, max_tokens)])
+            
+            except Exception as e:
+                if attempt < OPENROUTER_MAX_ATTEMPTS and _is_retriable(e):
+                    delay = _retry_after(e)
+                    if delay is None:
+                        delay = min(OPENROUTER_BACKOFF_MAX, OPENROUTER_BACKOFF_INITIAL * 2 ** (attempt - 1))
+                        delay += random.uniform(0, delay)
+                    logger.warning(f"OpenRouter attempt {attempt} failed ({e}), retrying in {delay:.2f}s")
+                    await asyncio.sleep(delay)
+                    continue
+                
+                logger.error(f"OpenRouter API error: {e}")
+                self._record_failure()
+                return None
+            
+            self.consecutive_failures = 0
+            self._cache_put(self.response_cache, cache_key, content, RESPONSE_CACHE_TTL_SECONDS)
+            return content
+    
+    def circuit_is_open(self) -> bool:
+        return time.monotonic() < self.circuit_open_until
+    
+    def _record_failure(self):
+        self.consecutive_failures += 1
+        if self.consecutive_failures >= CIRCUIT_FAIL_MAX:
+            self.circuit_open_until = time.monotonic() + CIRCUIT_RESET_SECONDS
+            self.consecutive_failures = 0
+            logger.error(f"OpenRouter circuit opened for {CIRCUIT_RESET_SECONDS}s")
+    
+    async def _call_openrouter_stream(self, prompt: str, model: Optional[str] = None, max_tokens: int = 1024) -> AsyncIterator[str]:
+        """Yield the reply text as OpenRouter streams it (SSE), raising on HTTP errors"""
+        payload = {
+            "model": model or self.model,
+            "messages": [
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": max_tokens,
+            "stream": True
+        }
         
-        return prompt
+        async with self.request_slots:
+            async with self.client.stream("POST", self.base_url, content=orjson.dumps(payload)) as response:
+                response.raise_for_status()
+                
+                async for line in response.aiter_lines():
+                    # Skip keep-alive comments and blank separators between events
+                    if not line.startswith("data:"):
+                        continue
+                    
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    
+                    event = orjson.loads(data)
+                    if "error" in event:
+                        # OpenRouter sends {"message": ...}, but a bare string must not turn into an AttributeError
+                        error = event["error"]
+                        raise RuntimeError(error.get("message", error) if isinstance(error, dict) else error)
+                    
+                    choices = event.get("choices")
+                    if not choices:
+                        continue
+                    
+                    delta = choices[0].get("delta", {}).get("content")
+                    if delta:
+                        yield delta
+    
+    def _build_prompt_with_phase(self, plant_name: str, sensor_values: Dict, phase: Dict, phase_analysis: Dict, message_type: str) -> str:
+        
+        # Static phase text is pre-rendered; only the readings are filled in here
+        template = _phase_prompt_template(phase["name"], message_type)
+        
+        values = {}
+        for key in PROMPT_SENSORS:
+            value = sensor_values[key]
+            analysis = phase_analysis.get(key, EMPTY_READING)
+            values[key] = "N/A" if value is None else value
+            values[f"{key}_status"] = analysis.get("status", "unknown")
+            values[f"{key}_message"] = analysis.get("message", "N/A")
+        
+        return template.format_map(values)
     
     def _get_overall_severity(self, phase_analysis: dict):
         """Determine overall severity from all sensors"""
-        severities = [s.get("severity", "normal") for s in phase_analysis.values()]
+        has_warning = False
+        for s in phase_analysis.values():
+            severity = s.get("severity", "normal")
+            if severity == "critical":
+                return "critical"
+            if severity == "warning":
+                has_warning = True
         
-        if "critical" in severities:
-            return "critical"
-        elif "warning" in severities:
-            return "warning"
-        return "normal"
+        return "warning" if has_warning else "normal"
     
-    def generate_daily_insight(self, pattern_analysis: Dict, phase: Dict) -> Dict:
+    async def agenerate_daily_insight(self, pattern_analysis: Dict, phase: Dict) -> Dict:
         """Generate AI insight from daily pattern analysis"""
         try:
             prompt = self._build_insight_prompt(pattern_analysis, phase, "daily")
-            response = self._call_openrouter(prompt)
+            response = await self._call_openrouter(prompt)
             
             if response is None:
                 return {"success": False, "error": "Failed to generate insight"}
@@ -272,11 +487,11 @@ Now generate the plant voice message:"""
             logger.error(f"Failed to generate daily insight: {e}")
             return {"success": False, "error": str(e)}
     
-    def generate_weekly_insight(self, pattern_analysis: Dict, phase: Dict) -> Dict:
+    async def agenerate_weekly_insight(self, pattern_analysis: Dict, phase: Dict) -> Dict:
         """Generate AI insight from weekly pattern analysis"""
         try:
             prompt = self._build_insight_prompt(pattern_analysis, phase, "weekly")
-            response = self._call_openrouter(prompt)
+            response = await self._call_openrouter(prompt)
             
             if response is None:
                 return {"success": False, "error": "Failed to generate insight"}
@@ -306,12 +521,8 @@ Now generate the plant voice message:"""
         active_sensors = ["temperature", "humidity", "light", "soil_moisture"]
         
         # Format sensor stats
-        sensor_stats = ""
-        for sensor_name, stats in sensors.items():
-            # Skip inactive sensors
-            if sensor_name not in active_sensors:
-                continue
-            sensor_stats += f"""
+        sensor_stats = "".join(
+            f"""
 {sensor_name.upper()}:
   - Range: {stats.get('min')} to {stats.get('max')}
   - Average: {stats.get('avg')}
@@ -319,34 +530,16 @@ Now generate the plant voice message:"""
   - Peak hour: {stats.get('peak_hour', 'N/A')}:00
   - Low hour: {stats.get('low_hour', 'N/A')}:00
 """
+            for sensor_name, stats in sensors.items()
+            # Skip inactive sensors
+            if sensor_name in active_sensors
+        )
         
-        # Format patterns
-        patterns_text = ""
-        if patterns:
-            patterns_text = "PATTERNS DETECTED:\n"
-            for p in patterns:
-                patterns_text += f"  - {p.get('description', '')}\n"
-        
-        # Format anomalies
-        anomalies_text = ""
-        if anomalies:
-            anomalies_text = "ANOMALIES DETECTED:\n"
-            for a in anomalies:
-                anomalies_text += f"  - {a.get('description', '')}\n"
-        
-        # Format correlations
-        correlations_text = ""
-        if correlations:
-            correlations_text = "CORRELATIONS:\n"
-            for c in correlations:
-                correlations_text += f"  - {c.get('description', '')}\n"
-        
-        # Format trends (for weekly)
-        trends_text = ""
-        if trends:
-            trends_text = "WEEKLY TRENDS:\n"
-            for t in trends:
-                trends_text += f"  - {t.get('description', '')}\n"
+        # Format patterns, anomalies, correlations and trends (for weekly)
+        patterns_text = _format_described("PATTERNS DETECTED:", patterns)
+        anomalies_text = _format_described("ANOMALIES DETECTED:", anomalies)
+        correlations_text = _format_described("CORRELATIONS:", correlations)
+        trends_text = _format_described("WEEKLY TRENDS:", trends)
         
         prompt = f"""You are an AI agricultural analyst for Plant Voice Labs. Generate a concise, insightful analysis based on the sensor data patterns.
 
@@ -1,13 +1,21 @@
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
-import pytz
+from types import MappingProxyType
+from bisect import bisect_left
+from functools import lru_cache
+from zoneinfo import ZoneInfo
 
 logger = logging.getLogger(__name__)
 
+JAKARTA_TZ = ZoneInfo('Asia/Jakarta')
+
 # GDD Base temperature for eggplant
 GDD_BASE_TEMP = 10  # °C
 
+# Assumed average daily GDD (based on 27°C avg temp); phase-specific curves can replace this
+AVG_DAILY_GDD = 17
+
 # Expected GDD accumulation per phase (based on research)
 EXPECTED_GDD = {
     "germination": {"min": 100, "max": 150},
@@ -17,10 +25,63 @@ EXPECTED_GDD = {
     "fruiting": {"min": 1400, "max": 1800}
 }
 
+# (sensor, detail label, unit, default optimal min, default optimal max)
+SENSOR_BENCHMARKS = (
+    ("temperature", "Temperature", "°C", 25, 30),
+    ("humidity", "Humidity", "%", 70, 90),
+    ("soil_moisture", "Soil moisture", "%", 50, 80),
+    ("light", "Light", " lux", 0, 10000)
+)
+
+# (comparison key, weight) used for the overall health score
+SCORE_WEIGHTS = (
+    ("temperature", 25),
+    ("humidity", 20),
+    ("soil_moisture", 25),
+    ("light", 15),
+    ("gdd_progress", 15)
+)
+
+STATUS_SCORES = MappingProxyType({
+    "optimal": 100,
+    "on_track": 100,
+    "slightly_low": 75,
+    "slightly_high": 75,
+    "slightly_behind": 75,
+    "mid_phase": 90,
+    "low": 50,
+    "high": 50,
+    "behind": 50,
+    "extended": 60,
+    "critical_low": 20,
+    "critical_high": 20
+})
+
+# Threshold order used by _get_status, with defaults for missing thresholds
+THRESHOLD_DEFAULTS = (
+    ("critical_low", 0),
+    ("low", 0),
+    ("optimal_min", 0),
+    ("optimal_max", 100),
+    ("high", 100),
+    ("critical_high", 100)
+)
+
+# 1 where a value equal to the bound still falls below it (value <= bound), 0 where it does not (value < bound)
+BOUND_INCLUSIVE = (1, 1, 0, 1, 0, 0)
+
+STATUS_LABELS = ("critical_low", "low", "slightly_low", "optimal", "slightly_high", "high", "critical_high")
+
+@lru_cache(maxsize=64)
+def _status_keys(bounds: tuple) -> Tuple[tuple, bool]:
+    """Pair each bound with its tie-break flag and report whether bisect can search them"""
+    keys = tuple(zip(bounds, BOUND_INCLUSIVE))
+    return keys, all(a <= b for a, b in zip(keys, keys[1:]))
+
 class GrowthComparator:
     def __init__(self):
         self.device_id = "PVL-001"
-        self.jakarta_tz = pytz.timezone('Asia/Jakarta')
+        self.jakarta_tz = JAKARTA_TZ
     
     def calculate_gdd(self, temp_avg: float) -> float:
         """Calculate Growing Degree Days from average temperature"""
@@ -28,16 +89,12 @@ class GrowthComparator:
     
     def calculate_accumulated_gdd(self, daily_temps: List[float]) -> float:
         """Calculate total accumulated GDD from list of daily average temperatures"""
-        total_gdd = 0
-        for temp in daily_temps:
-            total_gdd += self.calculate_gdd(temp)
-        return round(total_gdd, 1)
+        base = GDD_BASE_TEMP
+        return round(sum(temp - base for temp in daily_temps if temp > base), 1)
     
     def get_expected_gdd_for_day(self, day: int, phase: str) -> float:
         """Calculate expected GDD for a given experiment day"""
-        # Assume average daily GDD of 17 (based on 27°C avg temp)
-        avg_daily_gdd = 17
-        return day * avg_daily_gdd
+        return day * AVG_DAILY_GDD
     
     def compare_with_benchmark(self, sensor_stats: Dict, phase_data: Dict, experiment_day: int, accumulated_gdd: float) -> Dict:
         """
@@ -78,88 +135,35 @@ class GrowthComparator:
             "detail": timeline_detail
         }
         
-        # 2. Temperature comparison
-        if "temperature" in sensor_stats:
-            temp_avg = sensor_stats["temperature"].get("avg", 0)
-            temp_thresholds = phase_data.get("temperature", {})
-            optimal_min = temp_thresholds.get("optimal_min", 25)
-            optimal_max = temp_thresholds.get("optimal_max", 30)
-            optimal_center = (optimal_min + optimal_max) / 2
-            
-            deviation = self._calculate_deviation(temp_avg, optimal_min, optimal_max, optimal_center)
-            status = self._get_status(temp_avg, temp_thresholds, "temperature", phase_data.get("name", ""))
-            
-            comparisons["temperature"] = {
-                "current_avg": round(temp_avg, 1),
-                "benchmark_min": optimal_min,
-                "benchmark_max": optimal_max,
-                "benchmark_optimal": optimal_center,
-                "deviation_percent": deviation,
-                "status": status,
-                "detail": self._get_temp_detail(temp_avg, optimal_min, optimal_max, status)
-            }
-        
-        # 3. Humidity comparison
-        if "humidity" in sensor_stats:
-            humid_avg = sensor_stats["humidity"].get("avg", 0)
-            humid_thresholds = phase_data.get("humidity", {})
-            optimal_min = humid_thresholds.get("optimal_min", 70)
-            optimal_max = humid_thresholds.get("optimal_max", 90)
-            optimal_center = (optimal_min + optimal_max) / 2
-            
-            deviation = self._calculate_deviation(humid_avg, optimal_min, optimal_max, optimal_center)
-            status = self._get_status(humid_avg, humid_thresholds, "humidity", phase_data.get("name", ""))
+        # 2-5. Temperature, humidity, soil moisture and light against the phase optimum
+        phase_name = phase_data.get("name", "")
+        for sensor_name, label, unit, default_min, default_max in SENSOR_BENCHMARKS:
+            stats = sensor_stats.get(sensor_name)
+            if stats is None:
+                continue
             
-            comparisons["humidity"] = {
-                "current_avg": round(humid_avg, 1),
-                "benchmark_min": optimal_min,
-                "benchmark_max": optimal_max,
-                "benchmark_optimal": optimal_center,
-                "deviation_percent": deviation,
-                "status": status,
-                "detail": self._get_humidity_detail(humid_avg, optimal_min, optimal_max, status)
-            }
-        
-        # 4. Soil moisture comparison
-        if "soil_moisture" in sensor_stats:
-            soil_avg = sensor_stats["soil_moisture"].get("avg", 0)
-            soil_thresholds = phase_data.get("soil_moisture", {})
-            optimal_min = soil_thresholds.get("optimal_min", 50)
-            optimal_max = soil_thresholds.get("optimal_max", 80)
+            avg = stats.get("avg", 0)
+            thresholds = phase_data.get(sensor_name, {})
+            optimal_min = thresholds.get("optimal_min", default_min)
+            optimal_max = thresholds.get("optimal_max", default_max)
             optimal_center = (optimal_min + optimal_max) / 2
             
-            deviation = self._calculate_deviation(soil_avg, optimal_min, optimal_max, optimal_center)
-            status = self._get_status(soil_avg, soil_thresholds, "soil_moisture", phase_data.get("name", ""))
+            status = self._get_status(avg, thresholds, sensor_name, phase_name)
             
-            comparisons["soil_moisture"] = {
-                "current_avg": round(soil_avg, 1),
-                "benchmark_min": optimal_min,
-                "benchmark_max": optimal_max,
-                "benchmark_optimal": optimal_center,
-                "deviation_percent": deviation,
-                "status": status,
-                "detail": self._get_soil_detail(soil_avg, optimal_min, optimal_max, status)
-            }
-        
-        # 5. Light comparison (skip for germination as low light is preferred)
-        if "light" in sensor_stats:
-            light_avg = sensor_stats["light"].get("avg", 0)
-            light_thresholds = phase_data.get("light", {})
-            optimal_min = light_thresholds.get("optimal_min", 0)
-            optimal_max = light_thresholds.get("optimal_max", 10000)
-            optimal_center = (optimal_min + optimal_max) / 2
-            
-            deviation = self._calculate_deviation(light_avg, optimal_min, optimal_max, optimal_center)
-            status = self._get_status(light_avg, light_thresholds, "light", phase_data.get("name", ""))
+            # Low light is expected while germinating
+            if sensor_name == "light" and phase_name == "germination":
+                detail = f"Light {avg} lux. Low light is normal for germination phase."
+            else:
+                detail = self._get_detail(label, unit, avg, optimal_min, optimal_max, status)
             
-            comparisons["light"] = {
-                "current_avg": round(light_avg, 1),
+            comparisons[sensor_name] = {
+                "current_avg": round(avg, 1),
                 "benchmark_min": optimal_min,
                 "benchmark_max": optimal_max,
                 "benchmark_optimal": optimal_center,
-                "deviation_percent": deviation,
+                "deviation_percent": self._calculate_deviation(avg, optimal_min, optimal_max, optimal_center),
                 "status": status,
-                "detail": self._get_light_detail(light_avg, optimal_min, optimal_max, status, phase_data.get("name", ""))
+                "detail": detail
             }
         
         # 6. GDD Progress comparison
@@ -186,37 +190,13 @@ class GrowthComparator:
     def calculate_overall_score(self, comparisons: Dict) -> Dict:
         """Calculate overall health score from comparisons"""
         
-        scores = []
-        weights = {
-            "temperature": 25,
-            "humidity": 20,
-            "soil_moisture": 25,
-            "light": 15,
-            "gdd_progress": 15
-        }
-        
-        status_scores = {
-            "optimal": 100,
-            "on_track": 100,
-            "slightly_low": 75,
-            "slightly_high": 75,
-            "slightly_behind": 75,
-            "mid_phase": 90,
-            "low": 50,
-            "high": 50,
-            "behind": 50,
-            "extended": 60,
-            "critical_low": 20,
-            "critical_high": 20
-        }
-        
         total_weight = 0
         weighted_score = 0
         
-        for key, weight in weights.items():
-            if key in comparisons:
-                status = comparisons[key].get("status", "optimal")
-                score = status_scores.get(status, 70)
+        for key, weight in SCORE_WEIGHTS:
+            comparison = comparisons.get(key)
+            if comparison is not None:
+                score = STATUS_SCORES.get(comparison.get("status", "optimal"), 70)
                 weighted_score += score * weight
                 total_weight += weight
         
@@ -281,70 +261,37 @@ class GrowthComparator:
     
     def _get_status(self, value: float, thresholds: Dict, sensor_name: str = "", phase_name: str = "") -> str:
         """Determine status based on thresholds"""
-        critical_low = thresholds.get("critical_low", 0)
-        low = thresholds.get("low", 0)
-        optimal_min = thresholds.get("optimal_min", 0)
-        optimal_max = thresholds.get("optimal_max", 100)
-        high = thresholds.get("high", 100)
-        critical_high = thresholds.get("critical_high", 100)
-        
         # Special handling for light during germination
         if sensor_name == "light" and phase_name == "germination":
-            if value <= optimal_max:
+            if value <= thresholds.get("optimal_max", 100):
                 return "optimal"
-            elif value <= high:
+            elif value <= thresholds.get("high", 100):
                 return "slightly_high"
             else:
                 return "high"
         
-        if value <= critical_low:
-            return "critical_low"
-        elif value <= low:
-            return "low"
-        elif value < optimal_min:
-            return "slightly_low"
-        elif value <= optimal_max:
-            return "optimal"
-        elif value < high:
-            return "slightly_high"
-        elif value < critical_high:
-            return "high"
-        else:
-            return "critical_high"
-    
-    def _get_temp_detail(self, value: float, optimal_min: float, optimal_max: float, status: str) -> str:
-        if status == "optimal":
-            return f"Temperature {value}°C is within optimal range ({optimal_min}-{optimal_max}°C)"
-        elif status in ["slightly_low", "low", "critical_low"]:
-            return f"Temperature {value}°C is below optimal range ({optimal_min}-{optimal_max}°C)"
-        else:
-            return f"Temperature {value}°C is above optimal range ({optimal_min}-{optimal_max}°C)"
-    
-    def _get_humidity_detail(self, value: float, optimal_min: float, optimal_max: float, status: str) -> str:
-        if status == "optimal":
-            return f"Humidity {value}% is within optimal range ({optimal_min}-{optimal_max}%)"
-        elif status in ["slightly_low", "low", "critical_low"]:
-            return f"Humidity {value}% is below optimal range ({optimal_min}-{optimal_max}%)"
-        else:
-            return f"Humidity {value}% is above optimal range ({optimal_min}-{optimal_max}%)"
-    
-    def _get_soil_detail(self, value: float, optimal_min: float, optimal_max: float, status: str) -> str:
-        if status == "optimal":
-            return f"Soil moisture {value}% is within optimal range ({optimal_min}-{optimal_max}%)"
-        elif status in ["slightly_low", "low", "critical_low"]:
-            return f"Soil moisture {value}% is below optimal range ({optimal_min}-{optimal_max}%)"
-        else:
-            return f"Soil moisture {value}% is above optimal range ({optimal_min}-{optimal_max}%)"
+        bounds = tuple(thresholds.get(name, default) for name, default in THRESHOLD_DEFAULTS)
+        keys, ordered = _status_keys(bounds)
+        
+        # (value, 0.5) sorts just above bounds the value may equal and just below the rest
+        probe = (value, 0.5)
+        if ordered:
+            return STATUS_LABELS[bisect_left(keys, probe)]
+        
+        # Overlapping thresholds: the first bound the value falls under wins
+        for label, key in zip(STATUS_LABELS, keys):
+            if probe < key:
+                return label
+        return "critical_high"
     
-    def _get_light_detail(self, value: float, optimal_min: float, optimal_max: float, status: str, phase_name: str) -> str:
-        if phase_name == "germination":
-            return f"Light {value} lux. Low light is normal for germination phase."
+    def _get_detail(self, label: str, unit: str, value: float, optimal_min: float, optimal_max: float, status: str) -> str:
         if status == "optimal":
-            return f"Light {value} lux is within optimal range ({optimal_min}-{optimal_max} lux)"
+            position = "within"
         elif status in ["slightly_low", "low", "critical_low"]:
-            return f"Light {value} lux is below optimal range ({optimal_min}-{optimal_max} lux)"
+            position = "below"
         else:
-            return f"Light {value} lux is above optimal range ({optimal_min}-{optimal_max} lux)"
+            position = "above"
+        return f"{label} {value}{unit} is {position} optimal range ({optimal_min}-{optimal_max}{unit})"
 
 
 # Singleton instance
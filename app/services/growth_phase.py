@@ -1,13 +1,26 @@
-import json
+import orjson
 import os
 import logging
+import time
 from datetime import datetime
-import pytz
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Optional
+from zoneinfo import ZoneInfo
 
 logger = logging.getLogger(__name__)
 
 PHASE_FILE = os.path.join(os.path.dirname(__file__), "..", "..", "current_phase.json")
 
+JAKARTA_TZ = ZoneInfo('Asia/Jakarta')
+
+# Experiment start date 
+EXPERIMENT_START_DATE = datetime(2026, 1, 26, tzinfo=JAKARTA_TZ)
+
+# Phase only changes via update_phase; after the TTL the file is re-parsed only if its mtime moved
+PHASE_CACHE_TTL_SECONDS = 30
+_phase_cache = {"value": None, "loaded_at": 0.0, "mtime": None}
+
 # Sources:
 # - Walkling, P. & Reints, V. (2025). Eggplant: How to Grow It. SDSU Extension
 # - Manning, J., Brainard, D., & Heilig, G. (2016). How to Grow Eggplant. MSU Extension
@@ -249,54 +262,73 @@ PHASE_DATA = {
 }
 
 
+# View read-only PHASE_DATA per fase, supaya get_phase_info bisa dibagi tanpa salinan defensif
+PHASE_INFO_VIEWS = {name: MappingProxyType(info) for name, info in PHASE_DATA.items()}
+
+# Bentuk respons get_current_phase per fase, dibangun sekali saat import
+PHASE_RESPONSE_FIELDS = (
+    "duration_days", "temperature", "humidity", "light", "soil_moisture", "description",
+    "physiological_processes", "visual_indicators", "transition_signs", "common_problems", "tips"
+)
+PHASE_RESPONSE_TEMPLATES = {
+    name: {"name": name, "updated_at": None, **{field: info[field] for field in PHASE_RESPONSE_FIELDS}}
+    for name, info in PHASE_DATA.items()
+}
+
+
+def get_experiment_day(now: Optional[datetime] = None):
+    """Calculate current experiment day"""
+    if now is None:
+        now = datetime.now(JAKARTA_TZ)
+    delta = now - EXPERIMENT_START_DATE
+    return delta.days + 1
+
 def get_current_phase():
+    """Baca fase saat ini (cached, TTL PHASE_CACHE_TTL_SECONDS)"""
+    now = time.monotonic()
+    if _phase_cache["value"] is not None and now - _phase_cache["loaded_at"] < PHASE_CACHE_TTL_SECONDS:
+        return _phase_cache["value"]
+    
+    # TTL habis: parse ulang hanya jika file berubah di disk
+    try:
+        mtime = os.stat(PHASE_FILE).st_mtime_ns
+    except OSError:
+        mtime = None
+    
+    if _phase_cache["value"] is None or mtime != _phase_cache["mtime"]:
+        _phase_cache["value"] = _load_current_phase()
+        _phase_cache["mtime"] = mtime
+    
+    _phase_cache["loaded_at"] = now
+    return _phase_cache["value"]
+
+
+def invalidate_phase_cache():
+    """Paksa get_current_phase membaca ulang file JSON"""
+    _phase_cache["value"] = None
+
+
+def _load_current_phase():
     """Baca fase saat ini dari file JSON"""
     try:
-        if os.path.exists(PHASE_FILE):
-            with open(PHASE_FILE, "r") as f:
-                data = json.load(f)
-                phase_name = data.get("phase", "germination")
-                
-                if phase_name not in PHASE_DATA:
-                    phase_name = "germination"
-                
-                phase_info = PHASE_DATA[phase_name]
-                
-                return {
-                    "name": phase_name,
-                    "updated_at": data.get("updated_at"),
-                    "duration_days": phase_info["duration_days"],
-                    "temperature": phase_info["temperature"],
-                    "humidity": phase_info["humidity"],
-                    "light": phase_info["light"],
-                    "soil_moisture": phase_info["soil_moisture"],
-                    "description": phase_info["description"],
-                    "physiological_processes": phase_info["physiological_processes"],
-                    "visual_indicators": phase_info["visual_indicators"],
-                    "transition_signs": phase_info["transition_signs"],
-                    "common_problems": phase_info["common_problems"],
-                    "tips": phase_info["tips"]
-                }
+        with open(PHASE_FILE, "rb") as f:
+            data = orjson.loads(f.read())
+            phase_name = data.get("phase", "germination")
+            
+            if phase_name not in PHASE_DATA:
+                phase_name = "germination"
+            
+            response = dict(PHASE_RESPONSE_TEMPLATES[phase_name])
+            response["updated_at"] = data.get("updated_at")
+            return response
+    except FileNotFoundError:
+        pass
     except Exception as e:
         logger.error(f"Failed to read phase file: {e}")
     
-    phase_info = PHASE_DATA["germination"]
-    return {
-        "name": "germination",
-        "updated_at": None,
-        "notes": "",
-        "duration_days": phase_info["duration_days"],
-        "temperature": phase_info["temperature"],
-        "humidity": phase_info["humidity"],
-        "light": phase_info["light"],
-        "soil_moisture": phase_info["soil_moisture"],
-        "description": phase_info["description"],
-        "physiological_processes": phase_info["physiological_processes"],
-        "visual_indicators": phase_info["visual_indicators"],
-        "transition_signs": phase_info["transition_signs"],
-        "common_problems": phase_info["common_problems"],
-        "tips": phase_info["tips"]
-    }
+    response = {"name": "germination", "updated_at": None, "notes": ""}
+    response.update(PHASE_RESPONSE_TEMPLATES["germination"])
+    return response
 
 
 def update_phase(phase_name: str):
@@ -306,12 +338,18 @@ def update_phase(phase_name: str):
     
     data = {
         "phase": phase_name,
-        "updated_at": datetime.now(pytz.timezone('Asia/Jakarta')).isoformat()
+        "updated_at": datetime.now(JAKARTA_TZ).isoformat()
     }
     
-    with open(PHASE_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    # Tulis ke file sementara lalu os.replace, jadi pembaca tidak pernah melihat JSON setengah jadi
+    tmp_file = PHASE_FILE + ".tmp"
+    with open(tmp_file, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, PHASE_FILE)
     
+    invalidate_phase_cache()
     logger.info(f"Growth phase updated to: {phase_name}")
     return data
 
@@ -326,108 +364,96 @@ def analyze_sensor_for_phase(sensor_name: str, value: float):
     - critical_high: Plant damage may occur
     """
     phase = get_current_phase()
-    
-    # Map sensor name to phase data key
-    sensor_key_map = {
-        "temperature": "temperature",
-        "humidity": "humidity",
-        "light": "light",
-        "soil_moisture": "soil_moisture"
+    return _classify_sensor(phase["name"], sensor_name, value)
+
+
+def analyze_sensors(readings: dict, phase_name: str = None):
+    """Analisis beberapa sensor sekaligus; fase dibaca sekali (None dilewati)"""
+    if phase_name is None:
+        phase_name = get_current_phase()["name"]
+    return {
+        sensor_name: _classify_sensor(phase_name, sensor_name, value)
+        for sensor_name, value in readings.items()
+        if value is not None
     }
+
+
+# Label, severity dan template pesan per bucket, urut dari critical_low ke critical_high
+STATUS_BUCKETS = (
+    ("critical_low", "critical", "{sensor} is critically low for {phase} phase. Plant damage may occur."),
+    ("low", "warning", "{sensor} is below optimal for {phase} phase. Growth may be slowed."),
+    ("slightly_low", "warning", "{sensor} is slightly below optimal for {phase} phase."),
+    ("optimal", "normal", "{sensor} is perfect for {phase} phase."),
+    ("slightly_high", "warning", "{sensor} is slightly above optimal for {phase} phase."),
+    ("high", "warning", "{sensor} is above optimal for {phase} phase. Plant stress may begin."),
+    ("critical_high", "critical", "{sensor} is critically high for {phase} phase. Plant damage may occur.")
+)
+
+# Biji lebih suka gelap: saat germination, cahaya rendah (termasuk 0) justru optimal
+GERMINATION_LIGHT_BUCKETS = (
+    ("optimal", "normal", "Light is perfect for {phase} phase. Seeds prefer darkness."),
+    ("slightly_high", "warning", "Light is slightly above optimal for {phase} phase. Seeds prefer darkness."),
+    ("high", "warning", "Light is too high for {phase} phase. Seeds need darkness to germinate.")
+)
+
+THRESHOLD_ORDER = ("critical_low", "low", "optimal_min", "optimal_max", "high", "critical_high")
+
+# 1 = nilai yang sama dengan batas masih masuk bucket bawah (<=), 0 = sudah masuk bucket atas
+THRESHOLD_INCLUSIVE = (1, 1, 0, 1, 0, 0)
+
+
+def _build_classifier(phase_name: str, sensor_name: str, thresholds: dict):
+    """Generate fungsi klasifikasi khusus (fase, sensor) dengan batas ditulis sebagai literal"""
+    if sensor_name == "light" and phase_name == "germination":
+        keys = ((thresholds["optimal_max"], 1), (thresholds["high"], 1))
+        buckets = GERMINATION_LIGHT_BUCKETS
+    else:
+        keys = tuple(zip((thresholds[name] for name in THRESHOLD_ORDER), THRESHOLD_INCLUSIVE))
+        buckets = STATUS_BUCKETS
     
-    sensor_key = sensor_key_map.get(sensor_name)
-    if not sensor_key or sensor_key not in phase:
-        return {"status": "unknown", "severity": "normal", "message": "Sensor not configured"}
-    
-    thresholds = phase[sensor_key]
-    
-    critical_low = thresholds.get("critical_low")
-    low = thresholds.get("low")
-    optimal_min = thresholds.get("optimal_min")
-    optimal_max = thresholds.get("optimal_max")
-    high = thresholds.get("high")
-    critical_high = thresholds.get("critical_high")
-    unit = thresholds.get("unit", "")
-    
+    # Pesan sudah diformat di sini, jadi klasifikasi per reading tidak membuat string baru
     sensor_display = sensor_name.replace("_", " ").title()
-    phase_name = phase["name"]
+    namespace = {
+        f"R{i}": {"status": status, "severity": severity, "message": message.format(sensor=sensor_display, phase=phase_name)}
+        for i, (status, severity, message) in enumerate(buckets)
+    }
     
-    # Special handling for light during germination
-    # Seeds prefer darkness, so low light (including 0) is actually optimal
-    if sensor_name == "light" and phase_name == "germination":
-        if value <= optimal_max:
-            return {
-                "status": "optimal",
-                "severity": "normal",
-                "message": f"Light is perfect for {phase_name} phase. Seeds prefer darkness."
-            }
-        elif value <= high:
-            return {
-                "status": "slightly_high",
-                "severity": "warning",
-                "message": f"Light is slightly above optimal for {phase_name} phase. Seeds prefer darkness."
-            }
-        else:
-            return {
-                "status": "high",
-                "severity": "warning",
-                "message": f"Light is too high for {phase_name} phase. Seeds need darkness to germinate."
-            }
+    # Batas inklusif jadi "<=", eksklusif jadi "<"; bucket terakhir untuk sisa nilai di atas semua batas
+    lines = ["def classify(value):"]
+    for i, (bound, inclusive) in enumerate(keys):
+        lines.append(f"    if value {'<=' if inclusive else '<'} {float(bound)!r}: return R{i}")
+    lines.append(f"    return R{len(keys)}")
     
-    # Determine status based on thresholds
-    if value <= critical_low:
-        return {
-            "status": "critical_low",
-            "severity": "critical",
-            "message": f"{sensor_display} is critically low for {phase_name} phase. Plant damage may occur."
-        }
-    elif value <= low:
-        return {
-            "status": "low",
-            "severity": "warning",
-            "message": f"{sensor_display} is below optimal for {phase_name} phase. Growth may be slowed."
-        }
-    elif value >= critical_high:
-        return {
-            "status": "critical_high",
-            "severity": "critical",
-            "message": f"{sensor_display} is critically high for {phase_name} phase. Plant damage may occur."
-        }
-    elif value >= high:
-        return {
-            "status": "high",
-            "severity": "warning",
-            "message": f"{sensor_display} is above optimal for {phase_name} phase. Plant stress may begin."
-        }
-    elif optimal_min <= value <= optimal_max:
-        return {
-            "status": "optimal",
-            "severity": "normal",
-            "message": f"{sensor_display} is perfect for {phase_name} phase."
-        }
-    else:
-        # Between low and optimal_min, or between optimal_max and high
-        if value < optimal_min:
-            return {
-                "status": "slightly_low",
-                "severity": "warning",
-                "message": f"{sensor_display} is slightly below optimal for {phase_name} phase."
-            }
-        else:
-            return {
-                "status": "slightly_high",
-                "severity": "warning",
-                "message": f"{sensor_display} is slightly above optimal for {phase_name} phase."
-            }
+    exec("\n".join(lines), namespace)
+    return namespace["classify"]
 
 
+SENSOR_NOT_CONFIGURED = {"status": "unknown", "severity": "normal", "message": "Sensor not configured"}
+
+# (fase, sensor) -> fungsi klasifikasi, dibangun sekali saat import
+CLASSIFIERS = {
+    (phase_name, sensor_name): _build_classifier(phase_name, sensor_name, info[sensor_name])
+    for phase_name, info in PHASE_DATA.items()
+    for sensor_name in ("temperature", "humidity", "light", "soil_moisture")
+    if sensor_name in info
+}
+
+
+def _classify_sensor(phase_name: str, sensor_name: str, value: float):
+    """Klasifikasi murni (phase, sensor, value) -> hasil bersama (jangan diubah pemanggil)"""
+    classify = CLASSIFIERS.get((phase_name, sensor_name))
+    if classify is None:
+        return SENSOR_NOT_CONFIGURED
+    
+    return classify(value)
+
+
+@lru_cache(maxsize=1)
 def get_all_phases():
     """Return semua fase yang tersedia"""
-    return list(PHASE_DATA.keys())
+    return tuple(PHASE_DATA.keys())
 
 
 def get_phase_info(phase_name: str):
-    """Return informasi lengkap untuk fase tertentu"""
-    if phase_name not in PHASE_DATA:
-        return None
-    return PHASE_DATA[phase_name]
\ No newline at end of file
+    """Return informasi lengkap untuk fase tertentu (read-only, tanpa salinan)"""
+    return PHASE_INFO_VIEWS.get(phase_name)
\ No newline at end of file
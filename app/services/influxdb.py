@@ -1,50 +1,147 @@
-from influxdb_client import InfluxDBClient, Point
-from influxdb_client.client.write_api import SYNCHRONOUS
+from influxdb_client import InfluxDBClient
+from influxdb_client.client.write_api import SYNCHRONOUS, WriteOptions
 from app.config import settings
 from app.schemas import SensorPayload
-from datetime import datetime, timezone
 import logging
+import math
+import re
+import threading
+import time
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+SENSOR_TYPES = ("temperature", "humidity", "light", "soil_moisture", "ph", "tds")
+
+SENSOR_UNITS = {
+    "temperature": "°C",
+    "humidity": "%",
+    "light": "lux",
+    "soil_moisture": "%",
+    "ph": "",
+    "tds": "ppm"
+}
+
+# Flux query templates; {window} is a duration literal such as "24h" or "7d"
+QUERY_PREFIX = '''
+                from(bucket: "{bucket}")
+                |> range(start: -{window})
+                |> filter(fn: (r) => r["device_id"] == "{device_id}")
+                |> filter(fn: (r) => r["_field"] == "value")'''
+
+LATEST_QUERY = QUERY_PREFIX + '''
+                |> last()
+            '''
+
+HISTORY_QUERY = QUERY_PREFIX + '''
+                |> aggregateWindow(every: 30m, fn: mean, createEmpty: false)
+                |> group(columns: ["device_id"])
+                |> pivot(rowKey: ["_time"], columnKey: ["sensor_type"], valueColumn: "_value")
+                |> sort(columns: ["_time"])
+            '''
+
+HOURLY_QUERY = QUERY_PREFIX + '''
+                |> aggregateWindow(every: 1h, fn: mean, createEmpty: false)
+            '''
+
+DAILY_QUERY = QUERY_PREFIX + '''
+                |> aggregateWindow(every: 1d, fn: mean, createEmpty: false)
+            '''
+
+# device_id is spliced into a Flux string literal, so only plain identifiers are allowed
+DEVICE_ID_RE = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+@lru_cache(maxsize=128)
+def _render_query(template: str, bucket: str, device_id: str, window: str) -> str:
+    """Render a Flux template; the same device/window pairs repeat, so keep the strings"""
+    # Validated here so each distinct device_id is checked once, before it is cached
+    if not DEVICE_ID_RE.fullmatch(device_id):
+        raise ValueError(f"Invalid device_id for query: {device_id!r}")
+    return template.format(bucket=bucket, device_id=device_id, window=window)
+
+# Line protocol escaping, same rules as influxdb_client's Point
+TAG_ESCAPES = str.maketrans({",": r"\,", "=": r"\=", " ": r"\ ", "\n": r"\n", "\t": r"\t", "\r": r"\r"})
+STRING_FIELD_ESCAPES = str.maketrans({'"': r'\"', "\\": r"\\"})
+
+def _escape_tag(value: str) -> str:
+    escaped = value.translate(TAG_ESCAPES)
+    return escaped + " " if escaped.endswith("\\") else escaped
+
+def _line_fields(reading) -> str:
+    """Field set for one reading, sorted by key like Point; non-finite values are dropped"""
+    fields = [
+        f'status="{reading.status.translate(STRING_FIELD_ESCAPES)}"',
+        f'unit="{reading.unit.translate(STRING_FIELD_ESCAPES)}"'
+    ]
+    value = float(reading.value)
+    if math.isfinite(value):
+        text = str(value)
+        fields.append(f"value={text[:-2] if text.endswith('.0') else text}")
+    return ",".join(fields)
+
 class InfluxDBService:
     def __init__(self):
-        self.client = InfluxDBClient(
-            url=settings.INFLUXDB_URL,
-            token=settings.INFLUXDB_TOKEN,
-            org=settings.INFLUXDB_ORG
-        )
-        self.write_api = self.client.write_api(write_options=SYNCHRONOUS)
-        self.query_api = self.client.query_api()
+        # The client (and the batch writer thread) is created on first use, not at import
+        self.client = None
+        self.write_api = None
+        self.query_api = None
         self.bucket = settings.INFLUXDB_BUCKET
+        self._connect_lock = threading.Lock()
+    
+    def _connect(self):
+        if self.client is not None:
+            return
+        with self._connect_lock:
+            if self.client is not None:
+                return
+            client = InfluxDBClient(
+                url=settings.INFLUXDB_URL,
+                token=settings.INFLUXDB_TOKEN,
+                org=settings.INFLUXDB_ORG,
+                # Compresses batched writes and history query responses
+                enable_gzip=True
+            )
+            if settings.INFLUXDB_BATCH_WRITES:
+                # Payloads from all devices are coalesced into batched HTTP writes off the request path
+                self.write_api = client.write_api(
+                    write_options=WriteOptions(
+                        batch_size=500,
+                        flush_interval=1_000,
+                        jitter_interval=200,
+                        # Bounded retries so shutdown's final flush cannot hang for minutes
+                        retry_interval=1_000,
+                        max_retries=3,
+                        max_retry_time=15_000
+                    ),
+                    error_callback=self._on_batch_error
+                )
+            else:
+                self.write_api = client.write_api(write_options=SYNCHRONOUS)
+            self.query_api = client.query_api()
+            # Published last so other threads never see a half-built service
+            self.client = client
     
     def write_sensor_data(self, payload: SensorPayload) -> bool:
         try:
-            points = []
-            
-            # Convert timestamp to UTC datetime
-            dt = datetime.now(timezone.utc)
-            
-            # Create point for each sensor
-            for sensor_name, sensor_data in payload.sensors.dict().items():
-                point = Point("sensor_readings") \
-                    .tag("device_id", payload.device_id) \
-                    .tag("sensor_type", sensor_name) \
-                    .field("value", sensor_data["value"]) \
-                    .field("unit", sensor_data["unit"]) \
-                    .field("status", sensor_data["status"]) \
-                    .time(dt)
-                
-                points.append(point)
+            self._connect()
+            # One timestamp (ns) and one tag prefix shared by every sensor line
+            timestamp = time.time_ns()
+            prefix = f"sensor_readings,device_id={_escape_tag(payload.device_id)},sensor_type="
+            
+            # Build line protocol directly instead of a Point object per sensor
+            lines = [
+                f"{prefix}{_escape_tag(sensor_name)} {_line_fields(reading)} {timestamp}"
+                for sensor_name, reading in payload.sensors
+            ]
             
             # Write all points
             self.write_api.write(
                 bucket=self.bucket,
                 org=settings.INFLUXDB_ORG,
-                record=points
+                record="\n".join(lines)
             )
             
-            logger.info(f"Successfully wrote {len(points)} points for device {payload.device_id}")
+            logger.info(f"Successfully wrote {len(lines)} points for device {payload.device_id}")
             return True
             
         except Exception as e:
@@ -53,29 +150,17 @@ class InfluxDBService:
     
     def get_latest_readings(self, device_id: str) -> dict:
         try:
-            query = f'''
-                from(bucket: "{self.bucket}")
-                |> range(start: -1h)
-                |> filter(fn: (r) => r["device_id"] == "{device_id}")
-                |> filter(fn: (r) => r["_field"] == "value")
-                |> last()
-            '''
+            self._connect()
+            query = _render_query(LATEST_QUERY, self.bucket, device_id, "1h")
             
-            tables = self.query_api.query(query, org=settings.INFLUXDB_ORG)
+            records = self.query_api.query_stream(query, org=settings.INFLUXDB_ORG)
             
-            sensor_data = {}
-            
-            for table in tables:
-                for record in table.records:
-                    sensor_type = record.values.get("sensor_type")
-                    value = record.get_value()
-                    
-                    if sensor_type and value is not None:
-                        unit = self._get_unit_for_sensor(sensor_type)
-                        sensor_data[sensor_type] = {
-                            "value": value,
-                            "unit": unit
-                        }
+            # One record per sensor after last(); (sensor_type, value) pairs feed the dict directly
+            sensor_data = {
+                sensor_type: {"value": value, "unit": SENSOR_UNITS.get(sensor_type, "")}
+                for sensor_type, value in ((r.values.get("sensor_type"), r.get_value()) for r in records)
+                if sensor_type and value is not None
+            }
             
             if sensor_data:
                 logger.info(f"Retrieved latest readings for {device_id}: {len(sensor_data)} sensors")
@@ -88,40 +173,23 @@ class InfluxDBService:
             logger.error(f"Failed to query InfluxDB: {e}")
             return None
     
-    def _get_unit_for_sensor(self, sensor_type: str) -> str:
-        units = {
-            "temperature": "°C",
-            "humidity": "%",
-            "light": "lux",
-            "soil_moisture": "%",
-            "ph": "",
-            "tds": "ppm"
-        }
-        return units.get(sensor_type, "")
-    
     def get_readings_history(self, device_id: str, hours: int = 24) -> list:
+        """Get 30-minute averages pivoted into one row per window (one column per sensor)"""
         try:
-            query = f'''
-                from(bucket: "{self.bucket}")
-                |> range(start: -{hours}h)
-                |> filter(fn: (r) => r["device_id"] == "{device_id}")
-                |> filter(fn: (r) => r["_field"] == "value")
-                |> aggregateWindow(every: 30m, fn: mean, createEmpty: false)
-            '''
+            self._connect()
+            query = _render_query(HISTORY_QUERY, self.bucket, device_id, f"{hours}h")
             
-            tables = self.query_api.query(query, org=settings.INFLUXDB_ORG)
+            records = self.query_api.query_stream(query, org=settings.INFLUXDB_ORG)
             
             history = []
             
-            for table in tables:
-                for record in table.records:
-                    history.append({
-                        "time": record.get_time().isoformat(),
-                        "sensor_type": record.values.get("sensor_type"),
-                        "value": record.get_value()
-                    })
+            for record in records:
+                row = {"time": record.get_time().isoformat()}
+                for sensor_type in SENSOR_TYPES:
+                    row[sensor_type] = record.values.get(sensor_type)
+                history.append(row)
             
-            logger.info(f"Retrieved {len(history)} historical records for {device_id}")
+            logger.info(f"Retrieved {len(history)} historical rows for {device_id}")
             return history
             
         except Exception as e:
@@ -131,26 +199,21 @@ class InfluxDBService:
     def get_hourly_stats(self, device_id: str, hours: int = 24) -> list:
         """Get hourly statistics (min, max, mean) for pattern analysis"""
         try:
-            query = f'''
-                from(bucket: "{self.bucket}")
-                |> range(start: -{hours}h)
-                |> filter(fn: (r) => r["device_id"] == "{device_id}")
-                |> filter(fn: (r) => r["_field"] == "value")
-                |> aggregateWindow(every: 1h, fn: mean, createEmpty: false)
-            '''
+            self._connect()
+            query = _render_query(HOURLY_QUERY, self.bucket, device_id, f"{hours}h")
             
-            tables = self.query_api.query(query, org=settings.INFLUXDB_ORG)
+            records = self.query_api.query_stream(query, org=settings.INFLUXDB_ORG)
             
             hourly_data = []
             
-            for table in tables:
-                for record in table.records:
-                    hourly_data.append({
-                        "time": record.get_time().isoformat(),
-                        "hour": record.get_time().hour,
-                        "sensor_type": record.values.get("sensor_type"),
-                        "value": record.get_value()
-                    })
+            for record in records:
+                record_time = record.get_time()
+                hourly_data.append({
+                    "time": record_time.isoformat(),
+                    "hour": record_time.hour,
+                    "sensor_type": record.values.get("sensor_type"),
+                    "value": record.get_value()
+                })
             
             logger.info(f"Retrieved {len(hourly_data)} hourly stats for {device_id}")
             return hourly_data
@@ -162,26 +225,21 @@ class InfluxDBService:
     def get_daily_stats(self, device_id: str, days: int = 7) -> list:
         """Get daily statistics for weekly pattern analysis"""
         try:
-            query = f'''
-                from(bucket: "{self.bucket}")
-                |> range(start: -{days}d)
-                |> filter(fn: (r) => r["device_id"] == "{device_id}")
-                |> filter(fn: (r) => r["_field"] == "value")
-                |> aggregateWindow(every: 1d, fn: mean, createEmpty: false)
-            '''
+            self._connect()
+            query = _render_query(DAILY_QUERY, self.bucket, device_id, f"{days}d")
             
-            tables = self.query_api.query(query, org=settings.INFLUXDB_ORG)
+            records = self.query_api.query_stream(query, org=settings.INFLUXDB_ORG)
             
             daily_data = []
             
-            for table in tables:
-                for record in table.records:
-                    daily_data.append({
-                        "time": record.get_time().isoformat(),
-                        "date": record.get_time().strftime("%Y-%m-%d"),
-                        "sensor_type": record.values.get("sensor_type"),
-                        "value": record.get_value()
-                    })
+            for record in records:
+                record_time = record.get_time()
+                daily_data.append({
+                    "time": record_time.isoformat(),
+                    "date": record_time.strftime("%Y-%m-%d"),
+                    "sensor_type": record.values.get("sensor_type"),
+                    "value": record.get_value()
+                })
             
             logger.info(f"Retrieved {len(daily_data)} daily stats for {device_id}")
             return daily_data
@@ -190,7 +248,14 @@ class InfluxDBService:
             logger.error(f"Failed to get daily stats: {e}")
             return []
     
+    def _on_batch_error(self, conf, data, exception):
+        logger.error(f"Failed to write batch to InfluxDB: {exception}")
+    
     def close(self):
+        if self.client is None:
+            return
+        # Flush any queued batch before dropping the connection
+        self.write_api.close()
         self.client.close()
 
 # Singleton instance
@@ -1,52 +1,76 @@
-import json
+import orjson
 import os
-from typing import Dict, Optional
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+SEVERITY_RANK = {"normal": 0, "warning": 1, "critical": 2}
+
+def _classify_reading(value: float, critical_low, optimal_min, optimal_max, critical_high) -> Tuple[str, str]:
+    """Return (status, severity); bounds that are None are skipped"""
+    if critical_low is not None and value < critical_low:
+        return "critical_low", "critical"
+    if optimal_min is not None and value < optimal_min:
+        return "low", "warning"
+    if critical_high is not None and value > critical_high:
+        return "critical_high", "critical"
+    if optimal_max is not None and value > optimal_max:
+        return "high", "warning"
+    return "normal", "normal"
+
 class KnowledgeService:
     def __init__(self):
         self.knowledge_dir = os.path.join(os.path.dirname(__file__), "..", "knowledge")
         self.plants_dir = os.path.join(self.knowledge_dir, "plants")
         self.general_knowledge = self._load_general_knowledge()
-        self.plants_cache = {}
+        # The plant files ship with the app and are small, so load them all up front
+        self.plants_cache = self._load_plants()
+        self.available_plants = tuple(self.plants_cache)
+        # Per-instance memo keyed on the name as given; unknown names are cached too, so they warn only once
+        self._plant_lookup = lru_cache(maxsize=128)(self._find_plant)
     
     def _load_general_knowledge(self) -> Dict:
         try:
             filepath = os.path.join(self.knowledge_dir, "general.json")
-            with open(filepath, "r", encoding="utf-8") as f:
-                return json.load(f)
+            with open(filepath, "rb") as f:
+                return orjson.loads(f.read())
         except Exception as e:
-            logger.error(f"Failed to load general knowledge: {e}")
+            logger.error("Failed to load general knowledge: %s", e)
             return {}
     
-    def get_plant_knowledge(self, plant_name: str) -> Optional[Dict]:
-        plant_name = plant_name.lower()
-        
-        if plant_name in self.plants_cache:
-            return self.plants_cache[plant_name]
-        
+    def _load_plants(self) -> Dict:
+        plants = {}
         try:
-            filepath = os.path.join(self.plants_dir, f"{plant_name}.json")
-            with open(filepath, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                self.plants_cache[plant_name] = data
-                return data
-        except FileNotFoundError:
-            logger.warning(f"Plant knowledge not found: {plant_name}")
-            return None
+            # DirEntry names and file types come from the directory read itself, no per-file stat
+            with os.scandir(self.plants_dir) as it:
+                entries = [entry for entry in it if entry.name.endswith(".json") and entry.is_file()]
         except Exception as e:
-            logger.error(f"Failed to load plant knowledge for {plant_name}: {e}")
-            return None
+            logger.error("Failed to list available plants: %s", e)
+            return plants
+        
+        for entry in entries:
+            plant_name = entry.name[:-len(".json")].lower()
+            try:
+                with open(entry.path, "rb") as f:
+                    plants[plant_name] = orjson.loads(f.read())
+            except Exception as e:
+                logger.error("Failed to load plant knowledge for %s: %s", plant_name, e)
+        
+        return plants
+    
+    def get_plant_knowledge(self, plant_name: str) -> Optional[Dict]:
+        return self._plant_lookup(plant_name)
+    
+    def _find_plant(self, plant_name: str) -> Optional[Dict]:
+        plant = self.plants_cache.get(plant_name.lower())
+        if plant is None:
+            logger.warning("Plant knowledge not found: %s", plant_name)
+        return plant
     
     def get_available_plants(self) -> list:
-        try:
-            files = os.listdir(self.plants_dir)
-            return [f.replace(".json", "") for f in files if f.endswith(".json")]
-        except Exception as e:
-            logger.error(f"Failed to list available plants: {e}")
-            return []
+        return list(self.available_plants)
     
     def analyze_sensor_reading(self, plant_name: str, sensor_type: str, value: float) -> Dict:
         plant = self.get_plant_knowledge(plant_name)
@@ -84,22 +108,7 @@ class KnowledgeService:
                 "critical_range": {"low": critical_low, "high": critical_high}
             }
         
-        # Determine status with None checks
-        if critical_low is not None and value < critical_low:
-            status = "critical_low"
-            severity = "critical"
-        elif optimal_min is not None and value < optimal_min:
-            status = "low"
-            severity = "warning"
-        elif critical_high is not None and value > critical_high:
-            status = "critical_high"
-            severity = "critical"
-        elif optimal_max is not None and value > optimal_max:
-            status = "high"
-            severity = "warning"
-        else:
-            status = "normal"
-            severity = "normal"
+        status, severity = _classify_reading(value, critical_low, optimal_min, optimal_max, critical_high)
         
         return {
             "sensor_type": sensor_type,
@@ -138,10 +147,9 @@ class KnowledgeService:
             analysis = self.analyze_sensor_reading(plant_name, sensor_type, value)
             results[sensor_type] = analysis
             
-            if analysis.get("severity") == "critical":
-                overall_severity = "critical"
-            elif analysis.get("severity") == "warning" and overall_severity != "critical":
-                overall_severity = "warning"
+            severity = analysis.get("severity")
+            if SEVERITY_RANK.get(severity, 0) > SEVERITY_RANK[overall_severity]:
+                overall_severity = severity
         
         return {
             "plant": plant_name,
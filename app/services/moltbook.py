@@ -1,17 +1,70 @@
 import httpx
 import logging
+import orjson
+from operator import itemgetter
 from datetime import datetime
-import pytz
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+# Weekly stats per sensor, missing entries shown as 0
+STATS_DEFAULTS = {"min": 0, "max": 0, "avg": 0}
+MIN_MAX_AVG = itemgetter("min", "max", "avg")
+
+# Post bodies, filled with str.format_map
+DAILY_TEMPLATE = """📊 Day {day} Status:
+Temp: {temp:.1f}°C | Humidity: {humid:.1f}% | Soil: {soil:.1f}% | Light: {light:.0f} lux
+GDD: {gdd:.1f} accumulated
+Health Score: {health_score}/100
+
+Notable: {notable}
+
+Dashboard: https://dashboard.plantvoicelabs.com"""
+
+WEEKLY_TEMPLATE = """🌱 WEEK {week_num} SUMMARY
+
+Phase: {phase} (Day {first_day}-{last_day})
+
+ENVIRONMENTAL STATS:
+- Temperature: {temp_min:.1f}-{temp_max:.1f}°C (avg: {temp_avg:.1f}°C)
+- Humidity: {humid_min:.1f}-{humid_max:.1f}% (avg: {humid_avg:.1f}%)
+- Soil Moisture: {soil_min:.1f}-{soil_max:.1f}% (avg: {soil_avg:.1f}%)
+- Light: {light_min:.0f}-{light_max:.0f} lux (avg: {light_avg:.0f} lux)
+- GDD Progress: {gdd_total:.1f} accumulated
+
+HEALTH SCORE: {health_score}/100
+
+KEY FINDINGS:
+{findings}
+
+ANOMALIES:
+{anomalies}
+
+NEXT WEEK EXPECTATIONS:
+{next_expectations}
+
+Full analysis: https://dashboard.plantvoicelabs.com"""
+
 class MoltbookService:
     def __init__(self):
         self.api_key = settings.MOLTBOOK_API_KEY
         self.base_url = "https://www.moltbook.com/api/v1"
+        # One pooled client for the lifetime of the app instead of a new connection per post
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=30.0,
+            # Retries failed connection attempts only, so a post is never sent twice
+            transport=httpx.AsyncHTTPTransport(retries=3),
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "Content-Type": "application/json"
+            }
+        )
     
-    def post_daily_update(self, experiment_day: int, phase_name: str, sensor_data: dict, gdd: float, health_score: int, notable: str = "All stable"):
+    async def aclose(self):
+        await self.client.aclose()
+    
+    async def apost_daily_update(self, experiment_day: int, phase_name: str, sensor_data: dict, gdd: float, health_score: int, notable: str = "All stable"):
         """Post daily update to Moltbook"""
         
         try:
@@ -23,32 +76,34 @@ class MoltbookService:
             soil = sensor_data.get("soil_moisture", {}).get("avg", 0)
             light = sensor_data.get("light", {}).get("avg", 0)
             
-            content = f"""📊 Day {experiment_day} Status:
-Temp: {temp:.1f}°C | Humidity: {humid:.1f}% | Soil: {soil:.1f}% | Light: {light:.0f} lux
-GDD: {gdd:.1f} accumulated
-Health Score: {health_score}/100
-
-Notable: {notable}
-
-Dashboard: https://dashboard.plantvoicelabs.com"""
+            content = DAILY_TEMPLATE.format_map({
+                "day": experiment_day,
+                "temp": temp,
+                "humid": humid,
+                "soil": soil,
+                "light": light,
+                "gdd": gdd,
+                "health_score": health_score,
+                "notable": notable
+            })
             
-            return self._post_to_moltbook(title, content, "general")
+            return await self._post_to_moltbook(title, content, "general")
         
         except Exception as e:
-            logger.error(f"Failed to post daily update to Moltbook: {e}")
+            logger.error("Failed to post daily update to Moltbook: %s", e)
             return {"success": False, "error": str(e)}
     
-    def post_weekly_summary(self, week_num: int, phase_name: str, weekly_stats: dict, findings: list, anomalies: list, next_expectations: str):
+    async def apost_weekly_summary(self, week_num: int, phase_name: str, weekly_stats: dict, findings: list, anomalies: list, next_expectations: str):
         """Post weekly comprehensive summary to Moltbook"""
         
         try:
             title = f"Week {week_num} Complete: {phase_name.title()} Phase Analysis"
             
             # Format environmental stats
-            temp_stats = weekly_stats.get("temperature", {})
-            humid_stats = weekly_stats.get("humidity", {})
-            soil_stats = weekly_stats.get("soil_moisture", {})
-            light_stats = weekly_stats.get("light", {})
+            temp_min, temp_max, temp_avg = MIN_MAX_AVG({**STATS_DEFAULTS, **weekly_stats.get("temperature", {})})
+            humid_min, humid_max, humid_avg = MIN_MAX_AVG({**STATS_DEFAULTS, **weekly_stats.get("humidity", {})})
+            soil_min, soil_max, soil_avg = MIN_MAX_AVG({**STATS_DEFAULTS, **weekly_stats.get("soil_moisture", {})})
+            light_min, light_max, light_avg = MIN_MAX_AVG({**STATS_DEFAULTS, **weekly_stats.get("light", {})})
             gdd_total = weekly_stats.get("gdd_accumulated", 0)
             health_score = weekly_stats.get("health_score", 0)
             
@@ -58,65 +113,55 @@ Dashboard: https://dashboard.plantvoicelabs.com"""
             # Format anomalies
             anomalies_text = "\n".join([f"• {a}" for a in anomalies]) if anomalies else "• None detected"
             
-            content = f"""🌱 WEEK {week_num} SUMMARY
-
-Phase: {phase_name.title()} (Day {(week_num-1)*7+1}-{week_num*7})
-
-ENVIRONMENTAL STATS:
-- Temperature: {temp_stats.get('min', 0):.1f}-{temp_stats.get('max', 0):.1f}°C (avg: {temp_stats.get('avg', 0):.1f}°C)
-- Humidity: {humid_stats.get('min', 0):.1f}-{humid_stats.get('max', 0):.1f}% (avg: {humid_stats.get('avg', 0):.1f}%)
-- Soil Moisture: {soil_stats.get('min', 0):.1f}-{soil_stats.get('max', 0):.1f}% (avg: {soil_stats.get('avg', 0):.1f}%)
-- Light: {light_stats.get('min', 0):.0f}-{light_stats.get('max', 0):.0f} lux (avg: {light_stats.get('avg', 0):.0f} lux)
-- GDD Progress: {gdd_total:.1f} accumulated
-
-HEALTH SCORE: {health_score}/100
-
-KEY FINDINGS:
-{findings_text}
-
-ANOMALIES:
-{anomalies_text}
-
-NEXT WEEK EXPECTATIONS:
-{next_expectations}
-
-Full analysis: https://dashboard.plantvoicelabs.com"""
+            content = WEEKLY_TEMPLATE.format_map({
+                "week_num": week_num,
+                "phase": phase_name.title(),
+                "first_day": (week_num - 1) * 7 + 1,
+                "last_day": week_num * 7,
+                "temp_min": temp_min,
+                "temp_max": temp_max,
+                "temp_avg": temp_avg,
+                "humid_min": humid_min,
+                "humid_max": humid_max,
+                "humid_avg": humid_avg,
+                "soil_min": soil_min,
+                "soil_max": soil_max,
+                "soil_avg": soil_avg,
+                "light_min": light_min,
+                "light_max": light_max,
+                "light_avg": light_avg,
+                "gdd_total": gdd_total,
+                "health_score": health_score,
+                "findings": findings_text,
+                "anomalies": anomalies_text,
+                "next_expectations": next_expectations
+            })
             
-            return self._post_to_moltbook(title, content, "general")
+            return await self._post_to_moltbook(title, content, "general")
         
         except Exception as e:
-            logger.error(f"Failed to post weekly summary to Moltbook: {e}")
+            logger.error("Failed to post weekly summary to Moltbook: %s", e)
             return {"success": False, "error": str(e)}
     
-    def _post_to_moltbook(self, title: str, content: str, submolt: str = "general"):
+    async def _post_to_moltbook(self, title: str, content: str, submolt: str = "general"):
         """Internal method to post to Moltbook API"""
         
         try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json"
-            }
-            
             payload = {
                 "submolt": submolt,
                 "title": title,
                 "content": content
             }
             
-            with httpx.Client(timeout=30.0) as client:
-                response = client.post(
-                    f"{self.base_url}/posts",
-                    headers=headers,
-                    json=payload
-                )
-                response.raise_for_status()
-                
-                data = response.json()
-                logger.info(f"Posted to Moltbook: {title}")
-                return data
+            response = await self.client.post("/posts", content=orjson.dumps(payload))
+            response.raise_for_status()
+            
+            data = response.json()
+            logger.info("Posted to Moltbook: %s", title)
+            return data
         
         except Exception as e:
-            logger.error(f"Moltbook API error: {e}")
+            logger.error("Moltbook API error: %s", e)
             return None
 
 # Singleton instance
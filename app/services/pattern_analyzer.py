@@ -1,15 +1,61 @@
 import logging
-from typing import Dict, List, Optional
+import math
+from collections import defaultdict
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime, timedelta
-import pytz
-from statistics import mean, stdev
+from zoneinfo import ZoneInfo
 
 logger = logging.getLogger(__name__)
 
+JAKARTA_TZ = ZoneInfo('Asia/Jakarta')
+
+# Hour of day -> time-of-day bucket: 0 night (22-05), 1 morning (06-11), 2 afternoon (12-17), 3 evening (18-21)
+HOUR_BUCKET = tuple(0 if hour < 6 or hour >= 22 else 1 if hour < 12 else 2 if hour < 18 else 3 for hour in range(24))
+
+def _mean(values: List[float]) -> float:
+    """Correctly rounded mean (fsum), without statistics.mean's Fraction overhead"""
+    return math.fsum(values) / len(values)
+
+def _stdev(values: List[float]) -> float:
+    """Sample standard deviation (Welford); no sum-of-squares cancellation, so flat series give exactly 0"""
+    mean = 0.0
+    m2 = 0.0
+    for count, value in enumerate(values, 1):
+        delta = value - mean
+        mean += delta / count
+        m2 += delta * (value - mean)
+    return math.sqrt(m2 / (len(values) - 1))
+
+def _fused_stats(data: List[Tuple]) -> Tuple:
+    """Return (min, max, peak hour, low hour) from one pass over hourly points"""
+    low = high = None
+    peak_value, peak_hour = -math.inf, None
+    low_value, low_hour = math.inf, None
+    
+    for hour, value in data:
+        
+        # Missing/zero readings rank as 0 for the peak and +inf for the low; first hour wins ties
+        ranked = value if value else 0
+        if ranked > peak_value:
+            peak_value, peak_hour = ranked, hour
+        ranked = value if value else math.inf
+        if ranked < low_value or low_hour is None:
+            low_value, low_hour = ranked, hour
+        
+        if value is None:
+            continue
+        if low is None or value < low:
+            low = value
+        if high is None or value > high:
+            high = value
+    
+    return low, high, peak_hour, low_hour
+
 class PatternAnalyzer:
     def __init__(self):
         self.device_id = "PVL-001"
-        self.jakarta_tz = pytz.timezone('Asia/Jakarta')
+        self.jakarta_tz = JAKARTA_TZ
     
     def analyze_daily_patterns(self, hourly_data: List[Dict]) -> Dict:
         """Analyze patterns from last 24 hours of data"""
@@ -17,17 +63,10 @@ class PatternAnalyzer:
         if not hourly_data:
             return {"success": False, "error": "No data available"}
         
-        # Organize data by sensor
-        sensors = {}
+        # Organize data by sensor as (hour, value) pairs
+        sensors = defaultdict(list)
         for record in hourly_data:
-            sensor = record["sensor_type"]
-            if sensor not in sensors:
-                sensors[sensor] = []
-            sensors[sensor].append({
-                "hour": record["hour"],
-                "value": record["value"],
-                "time": record["time"]
-            })
+            sensors[record["sensor_type"]].append((record["hour"], record["value"]))
         
         analysis = {
             "success": True,
@@ -50,27 +89,26 @@ class PatternAnalyzer:
             if len(data) < 2:
                 continue
                 
-            values = [d["value"] for d in data if d["value"] is not None]
+            values = [value for _, value in data if value is not None]
             
             if not values:
                 continue
             
+            low, high, peak_hour, low_hour = _fused_stats(data)
+            # fsum keeps the mean correctly rounded, as statistics.mean did
+            avg = _mean(values)
+            
             sensor_analysis = {
-                "min": round(min(values), 2),
-                "max": round(max(values), 2),
-                "avg": round(mean(values), 2),
-                "range": round(max(values) - min(values), 2),
+                "min": round(low, 2),
+                "max": round(high, 2),
+                "avg": round(avg, 2),
+                "range": round(high - low, 2),
                 "trend": self._calculate_trend(values),
-                "std_dev": round(stdev(values), 2) if len(values) > 1 else 0
+                "std_dev": round(_stdev(values), 2) if len(values) > 1 else 0,
+                "peak_hour": peak_hour,
+                "low_hour": low_hour
             }
             
-            # Find peak and low hours
-            peak_hour = max(data, key=lambda x: x["value"] if x["value"] else 0)
-            low_hour = min(data, key=lambda x: x["value"] if x["value"] else float('inf'))
-            
-            sensor_analysis["peak_hour"] = peak_hour["hour"]
-            sensor_analysis["low_hour"] = low_hour["hour"]
-            
             analysis["sensors"][sensor_name] = sensor_analysis
             
             # Detect patterns
@@ -95,16 +133,10 @@ class PatternAnalyzer:
         if not daily_data:
             return {"success": False, "error": "No data available"}
         
-        # Organize data by sensor and date
-        sensors = {}
+        # Organize data by sensor as (date, value) pairs
+        sensors = defaultdict(list)
         for record in daily_data:
-            sensor = record["sensor_type"]
-            if sensor not in sensors:
-                sensors[sensor] = []
-            sensors[sensor].append({
-                "date": record["date"],
-                "value": record["value"]
-            })
+            sensors[record["sensor_type"]].append((record["date"], record["value"]))
         
         analysis = {
             "success": True,
@@ -125,7 +157,7 @@ class PatternAnalyzer:
             if len(data) < 2:
                 continue
             
-            values = [d["value"] for d in data if d["value"] is not None]
+            values = [value for _, value in data if value is not None]
             
             if not values:
                 continue
@@ -134,7 +166,7 @@ class PatternAnalyzer:
             sensor_analysis = {
                 "min": round(min(values), 2),
                 "max": round(max(values), 2),
-                "avg": round(mean(values), 2),
+                "avg": round(_mean(values), 2),
                 "trend": self._calculate_trend(values),
                 "change_percent": self._calculate_change_percent(values)
             }
@@ -153,8 +185,10 @@ class PatternAnalyzer:
         if len(values) < 2:
             return "stable"
         
-        first_half = mean(values[:len(values)//2])
-        second_half = mean(values[len(values)//2:])
+        # Halves are summed in place with islice instead of copying two slices
+        half = len(values) // 2
+        first_half = math.fsum(islice(values, half)) / half
+        second_half = math.fsum(islice(values, half, None)) / (len(values) - half)
         
         diff_percent = ((second_half - first_half) / first_half) * 100 if first_half != 0 else 0
         
@@ -171,21 +205,22 @@ class PatternAnalyzer:
             return 0
         return round(((values[-1] - values[0]) / values[0]) * 100, 2)
     
-    def _detect_daily_pattern(self, sensor: str, data: List[Dict]) -> Optional[Dict]:
+    def _detect_daily_pattern(self, sensor: str, data: List[Tuple]) -> Optional[Dict]:
         """Detect recurring daily patterns"""
         
-        # Group by time of day
-        morning = [d["value"] for d in data if d["hour"] in range(6, 12) and d["value"]]
-        afternoon = [d["value"] for d in data if d["hour"] in range(12, 18) and d["value"]]
-        evening = [d["value"] for d in data if d["hour"] in range(18, 22) and d["value"]]
-        night = [d["value"] for d in data if (d["hour"] >= 22 or d["hour"] < 6) and d["value"]]
+        # Group by time of day in one pass
+        buckets = ([], [], [], [])
+        for hour, value in data:
+            if value:
+                buckets[HOUR_BUCKET[hour]].append(value)
+        night, morning, afternoon, evening = buckets
         
         patterns = []
         
         # Check for afternoon patterns
         if morning and afternoon:
-            morning_avg = mean(morning)
-            afternoon_avg = mean(afternoon)
+            morning_avg = _mean(morning)
+            afternoon_avg = _mean(afternoon)
             diff_percent = ((afternoon_avg - morning_avg) / morning_avg) * 100 if morning_avg != 0 else 0
             
             if sensor == "temperature" and diff_percent > 10:
@@ -215,12 +250,14 @@ class PatternAnalyzer:
         if len(values) < 3:
             return None
         
-        avg = mean(values)
-        std = stdev(values) if len(values) > 1 else 0
+        avg = _mean(values)
+        std = _stdev(values)
         
         # Check for values outside 2 standard deviations
-        for val in values:
-            if std > 0 and abs(val - avg) > 2 * std:
+        if std > 0:
+            limit = 2 * std
+            val = next((v for v in values if abs(v - avg) > limit), None)
+            if val is not None:
                 return {
                     "sensor": sensor,
                     "type": "outlier",
@@ -228,9 +265,9 @@ class PatternAnalyzer:
                 }
         
         # Check for sudden drops (potential sensor issues)
-        for i in range(1, len(values)):
-            if values[i-1] != 0:
-                change = ((values[i] - values[i-1]) / values[i-1]) * 100
+        for prev, curr in zip(values, values[1:]):
+            if prev != 0:
+                change = ((curr - prev) / prev) * 100
                 if abs(change) > 50:
                     return {
                         "sensor": sensor,
@@ -251,24 +288,21 @@ class PatternAnalyzer:
             humid_data = sensors["humidity"]
             
             # Match by hour
-            temp_by_hour = {d["hour"]: d["value"] for d in temp_data if d["value"]}
-            humid_by_hour = {d["hour"]: d["value"] for d in humid_data if d["value"]}
+            temp_by_hour = {hour: value for hour, value in temp_data if value}
+            humid_by_hour = {hour: value for hour, value in humid_data if value}
             
-            common_hours = set(temp_by_hour.keys()) & set(humid_by_hour.keys())
+            # (temperature, humidity) pairs in hour order
+            pairs = [(temp_by_hour[h], humid_by_hour[h]) for h in sorted(temp_by_hour.keys() & humid_by_hour.keys())]
             
-            if len(common_hours) >= 3:
-                # Simple correlation check
+            if len(pairs) >= 3:
+                # Simple correlation check: of the hour-to-hour temperature rises, how many saw humidity fall
                 temp_increases = 0
                 humid_decreases = 0
                 
-                hours_list = sorted(common_hours)
-                for i in range(1, len(hours_list)):
-                    prev_h = hours_list[i-1]
-                    curr_h = hours_list[i]
-                    
-                    if temp_by_hour[curr_h] > temp_by_hour[prev_h]:
+                for (prev_temp, prev_humid), (curr_temp, curr_humid) in zip(pairs, pairs[1:]):
+                    if curr_temp > prev_temp:
                         temp_increases += 1
-                        if humid_by_hour[curr_h] < humid_by_hour[prev_h]:
+                        if curr_humid < prev_humid:
                             humid_decreases += 1
                 
                 if temp_increases > 0 and humid_decreases / temp_increases > 0.6:
@@ -281,7 +315,7 @@ class PatternAnalyzer:
         # Check soil moisture trend
         if "soil_moisture" in sensors:
             soil_data = sensors["soil_moisture"]
-            values = [d["value"] for d in soil_data if d["value"]]
+            values = [value for _, value in soil_data if value]
             
             if len(values) >= 3:
                 trend = self._calculate_trend(values)
@@ -1,85 +1,188 @@
+import asyncio
 import logging
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.cron import CronTrigger
-from datetime import datetime
-import pytz
-import uuid
-import json
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+import secrets
+import orjson
 import os
+import time
+from app.services.ai_engine import ai_engine
+from app.services.growth_comparator import growth_comparator
+from app.services.growth_phase import get_current_phase, get_experiment_day
+from app.services.influxdb import influxdb_service
+from app.services.moltbook import moltbook_service
+from app.services.pattern_analyzer import pattern_analyzer
+from app.services.tts import AUDIO_RETENTION_DAYS, tts_service
 
 logger = logging.getLogger(__name__)
 
+JAKARTA_TZ = ZoneInfo('Asia/Jakarta')
+
+# Persisted state lives in the project root, resolved once at import
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+MESSAGES_FILE = os.path.join(PROJECT_DIR, "messages.json")
+INSIGHTS_FILE = os.path.join(PROJECT_DIR, "insights.json")
+COMPARISON_FILE = os.path.join(PROJECT_DIR, "comparison.json")
+
+# Hours (WIB) of the scheduled plant messages
+SCHEDULE_HOURS = (6, 8, 10, 12, 14, 16, 18, 20, 22)
+
+# (job id, weekday or None for daily, hour, minute, method, args), all in WIB
+SCHEDULED_JOBS = (
+    # Morning greeting - 06:00 WIB
+    ("greeting_morning", None, 6, 0, "generate_scheduled_message", ("greeting_morning",)),
+    # Regular reports - 08:00, 10:00, 12:00, 14:00, 16:00, 18:00, 20:00 WIB
+    *((f"report_{hour}", None, hour, 0, "generate_scheduled_message", ("report",)) for hour in SCHEDULE_HOURS[1:-1]),
+    # Night greeting - 22:00 WIB
+    ("greeting_night", None, 22, 0, "generate_scheduled_message", ("greeting_night",)),
+    # Daily insight - 06:05 WIB (after morning greeting)
+    ("daily_insight", None, 6, 5, "generate_daily_insight", ()),
+    # Weekly insight - Monday 06:10 WIB
+    ("weekly_insight", 0, 6, 10, "generate_weekly_insight", ()),
+    # Growth comparison - Daily 06:15 WIB
+    ("growth_comparison", None, 6, 15, "generate_growth_comparison", ()),
+    # Moltbook daily post - 18:00 WIB
+    ("moltbook_daily", None, 18, 0, "post_daily_moltbook", ()),
+    # Moltbook weekly summary - Sunday 20:00 WIB
+    ("moltbook_weekly", 6, 20, 0, "post_weekly_moltbook", ()),
+    # Audio cleanup - 03:00 WIB, while the plant is asleep
+    ("audio_cleanup", None, 3, 0, "cleanup_audio", ())
+)
+
+# Status reads within this window share one wall-clock lookup
+CLOCK_CACHE_SECONDS = 1.0
+
+# The daily insight and growth comparison run ten minutes apart over the same 24h window
+MORNING_ANALYSIS_TTL_SECONDS = 15 * 60
+
+# Threads shared by every blocking call the scheduler offloads (InfluxDB, analysis, file writes)
+SCHEDULER_WORKERS = 4
+
+# A job whose fire time passed by more than this (e.g. host suspended) is skipped, not run late
+MISFIRE_GRACE_SECONDS = 60
+
+# Upper bound on one sleep, so wall-clock adjustments are noticed within minutes
+MAX_SLEEP_SECONDS = 300
+
+# Fallback readings when the ESP32 has not reported; shared, so callers must not mutate it
+MOCK_SENSOR_DATA = {
+    "temperature": {"value": 28, "unit": "°C"},
+    "humidity": {"value": 65, "unit": "%"},
+    "light": {"value": 20000, "unit": "lux"},
+    "soil_moisture": {"value": 72, "unit": "%"},
+    "ph": {"value": 6.3},
+    "tds": {"value": 1100, "unit": "ppm"}
+}
+
+# Bursts of state changes within this window are written to disk once
+SAVE_DEBOUNCE_SECONDS = 0.5
+
+# Latest readings are reused for this long, so bursts of jobs and dashboard polls share one query
+SENSOR_CACHE_TTL_SECONDS = 30
+SENSOR_CACHE_MAXSIZE = 8
+
+def _next_fire(after: datetime):
+    """Earliest fire time strictly after `after` and the jobs due at it"""
+    fire_at, due = None, []
+    for job in SCHEDULED_JOBS:
+        _, weekday, hour, minute = job[:4]
+        candidate = after.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if weekday is not None:
+            candidate += timedelta(days=(weekday - after.weekday()) % 7)
+        if candidate <= after:
+            candidate += timedelta(days=1 if weekday is None else 7)
+        if fire_at is None or candidate < fire_at:
+            fire_at, due = candidate, [job]
+        elif candidate == fire_at:
+            due.append(job)
+    return fire_at, due
+
 class PlantScheduler:
     def __init__(self):
-        self.scheduler = AsyncIOScheduler(timezone=pytz.timezone('Asia/Jakarta'))
+        self._timer_task = None
+        # Strong references so running jobs are not garbage collected mid-flight
+        self._job_tasks = set()
+        # Bounded pool so job bursts reuse a few threads instead of spreading over the loop's default executor
+        self._executor = ThreadPoolExecutor(max_workers=SCHEDULER_WORKERS, thread_name_prefix="plant-sched")
+        # (monotonic fetch time, hourly_data, pattern_analysis) shared by the 06:05 insight and 06:15 comparison
+        self._morning_cache = None
+        # (monotonic tick, WIB datetime) behind _cached_now
+        self._now_cache = None
         self.latest_message = None
         self.latest_insight = None
         self.latest_comparison = None
-        self.messages_file = os.path.join(os.path.dirname(__file__), "..", "..", "messages.json")
-        self.insights_file = os.path.join(os.path.dirname(__file__), "..", "..", "insights.json")
-        self.comparison_file = os.path.join(os.path.dirname(__file__), "..", "..", "comparison.json")
+        self.messages_file = MESSAGES_FILE
+        self.insights_file = INSIGHTS_FILE
+        self.comparison_file = COMPARISON_FILE
         self.device_id = "PVL-001"
-        self._load_latest_message()
-        self._load_latest_insight()
-        self._load_latest_comparison()
-    
-    def _load_latest_message(self):
-        try:
-            if os.path.exists(self.messages_file):
-                with open(self.messages_file, "r", encoding="utf-8") as f:
-                    self.latest_message = json.load(f)
-        except Exception as e:
-            logger.error(f"Failed to load latest message: {e}")
-            self.latest_message = None
+        # State attribute -> JSON file it is persisted to
+        self._state_files = {
+            "latest_message": self.messages_file,
+            "latest_insight": self.insights_file,
+            "latest_comparison": self.comparison_file
+        }
+        self._pending_saves = {}
+        # Every debounced save task, including ones past their sleep and already writing
+        self._save_tasks = set()
+        self._save_locks = {attr: asyncio.Lock() for attr in self._state_files}
+        # device_id -> (monotonic fetch time, readings)
+        self._sensor_cache = {}
+        self._load_state()
     
-    def _save_latest_message(self):
-        try:
-            with open(self.messages_file, "w", encoding="utf-8") as f:
-                json.dump(self.latest_message, f, default=str)
-        except Exception as e:
-            logger.error(f"Failed to save latest message: {e}")
+    def _offload(self, func, *args):
+        """Run a blocking call on the scheduler's thread pool; returns an awaitable"""
+        return asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
     
-    def _load_latest_insight(self):
-        try:
-            if os.path.exists(self.insights_file):
-                with open(self.insights_file, "r", encoding="utf-8") as f:
-                    self.latest_insight = json.load(f)
-        except Exception as e:
-            logger.error(f"Failed to load latest insight: {e}")
-            self.latest_insight = None
+    def _load_state(self):
+        """Restore the persisted message, insight and comparison from their JSON files"""
+        for attr, path in self._state_files.items():
+            try:
+                with open(path, "rb") as f:
+                    setattr(self, attr, orjson.loads(f.read()))
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.error(f"Failed to load {attr.replace('_', ' ')}: {e}")
+                setattr(self, attr, None)
     
-    def _save_latest_insight(self):
-        try:
-            with open(self.insights_file, "w", encoding="utf-8") as f:
-                json.dump(self.latest_insight, f, default=str)
-        except Exception as e:
-            logger.error(f"Failed to save latest insight: {e}")
+    def _schedule_save(self, attr: str):
+        """Persist self.<attr> after SAVE_DEBOUNCE_SECONDS; saves requested meanwhile share that write"""
+        if attr not in self._pending_saves:
+            task = asyncio.get_running_loop().create_task(self._debounced_save(attr))
+            self._pending_saves[attr] = task
+            self._save_tasks.add(task)
+            task.add_done_callback(self._save_tasks.discard)
     
-    def _load_latest_comparison(self):
-        try:
-            if os.path.exists(self.comparison_file):
-                with open(self.comparison_file, "r", encoding="utf-8") as f:
-                    self.latest_comparison = json.load(f)
-        except Exception as e:
-            logger.error(f"Failed to load latest comparison: {e}")
-            self.latest_comparison = None
+    async def _debounced_save(self, attr: str):
+        await asyncio.sleep(SAVE_DEBOUNCE_SECONDS)
+        # Changes from here on schedule a new write
+        del self._pending_saves[attr]
+        async with self._save_locks[attr]:
+            await self._offload(self._write_state, attr)
     
-    def _save_latest_comparison(self):
+    def _write_state(self, attr: str):
+        path = self._state_files[attr]
         try:
-            with open(self.comparison_file, "w", encoding="utf-8") as f:
-                json.dump(self.latest_comparison, f, default=str)
+            data = orjson.dumps(getattr(self, attr), default=str, option=orjson.OPT_NON_STR_KEYS)
+            # Write then rename, so a crash mid-write never leaves a truncated file behind
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+                # Data must be on disk before the rename, or a power cut can leave an empty file
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, path)
         except Exception as e:
-            logger.error(f"Failed to save latest comparison: {e}")
+            logger.error(f"Failed to save {attr.replace('_', ' ')}: {e}")
     
     async def generate_scheduled_message(self, message_type: str):
         try:
-            from app.services.ai_engine import ai_engine
-            from app.services.tts import tts_service
-            
             logger.info(f"Generating scheduled message: {message_type}")
             
             # Get latest sensor data from InfluxDB (from ESP32)
-            sensor_data = self._get_latest_sensor_data()
+            sensor_data = await self._get_latest_sensor_data()
             
             if not sensor_data:
                 logger.warning("No sensor data available, skipping message generation")
@@ -88,7 +191,7 @@ class PlantScheduler:
             plant_name = "eggplant"
             
             # Generate AI response with context
-            ai_result = ai_engine.generate_plant_response_scheduled(
+            ai_result = await ai_engine.agenerate_plant_response_scheduled(
                 plant_name=plant_name,
                 sensor_data=sensor_data,
                 message_type=message_type
@@ -101,16 +204,17 @@ class PlantScheduler:
             text_response = ai_result.get("message")
             
             # Generate TTS
-            audio_filename = tts_service.generate_speech(text_response)
+            audio_filename = await tts_service.agenerate_speech(text_response)
             
             if not audio_filename:
                 logger.error("TTS generation failed")
                 return
             
-            # Save latest message
-            self.latest_message = {
-                "id": str(uuid.uuid4()),
-                "timestamp": datetime.now(pytz.timezone('Asia/Jakarta')).isoformat(),
+            # Build the full message first, then publish it with a single
+            # reference swap so readers never see a half-built dict
+            message = {
+                "id": secrets.token_hex(16),
+                "timestamp": datetime.now(JAKARTA_TZ).isoformat(),
                 "message_type": message_type,
                 "text": text_response,
                 "audio_file": audio_filename,
@@ -118,21 +222,29 @@ class PlantScheduler:
                 "analysis": ai_result.get("analysis", {})
             }
             
-            self._save_latest_message()
+            self.latest_message = message
+            self._schedule_save("latest_message")
             logger.info(f"Message generated and saved: {message_type}")
             
         except Exception as e:
             logger.error(f"Scheduled message error: {e}")
     
-    def _get_latest_sensor_data(self):
+    async def _get_latest_sensor_data(self):
+        cached = self._sensor_cache.get(self.device_id)
+        if cached is not None and time.monotonic() - cached[0] < SENSOR_CACHE_TTL_SECONDS:
+            return cached[1]
+        
         try:
-            from app.services.influxdb import influxdb_service
-            
             # Query latest data from InfluxDB (sent by ESP32)
-            sensor_data = influxdb_service.get_latest_readings(self.device_id)
+            sensor_data = await self._offload(influxdb_service.get_latest_readings, self.device_id)
             
             if sensor_data:
                 logger.info(f"Got real sensor data from ESP32: {list(sensor_data.keys())}")
+                # Mock fallbacks are not cached, so the first real reading is picked up at once
+                self._sensor_cache.pop(self.device_id, None)
+                if len(self._sensor_cache) >= SENSOR_CACHE_MAXSIZE:
+                    del self._sensor_cache[next(iter(self._sensor_cache))]
+                self._sensor_cache[self.device_id] = (time.monotonic(), sensor_data)
                 return sensor_data
             
         except Exception as e:
@@ -140,18 +252,24 @@ class PlantScheduler:
         
         # Fallback to mock data if ESP32 not connected
         logger.warning("ESP32 not connected, using mock sensor data")
-        return {
-            "temperature": {"value": 28, "unit": "°C"},
-            "humidity": {"value": 65, "unit": "%"},
-            "light": {"value": 20000, "unit": "lux"},
-            "soil_moisture": {"value": 72, "unit": "%"},
-            "ph": {"value": 6.3},
-            "tds": {"value": 1100, "unit": "ppm"}
-        }
+        return MOCK_SENSOR_DATA
+    
+    def invalidate_sensor_cache(self, device_id: str = None):
+        """Drop cached readings for one device (or all) so the next read hits InfluxDB"""
+        if device_id is None:
+            self._sensor_cache.clear()
+        else:
+            self._sensor_cache.pop(device_id, None)
     
     def get_latest_message(self):
+        """Lock-free read; writers replace the whole dict, never mutate it"""
         return self.latest_message
     
+    def get_snapshot(self):
+        """Return (latest_message, is_sleeping, next_update) from a single clock read"""
+        now = self._cached_now()
+        return self.latest_message, self.is_sleeping_time(now), self.get_next_update_time(now)
+    
     def get_latest_insight(self):
         return self.latest_insight
     
@@ -161,26 +279,19 @@ class PlantScheduler:
     async def generate_growth_comparison(self):
         """Generate daily growth comparison with benchmark"""
         try:
-            from app.services.influxdb import influxdb_service
-            from app.services.pattern_analyzer import pattern_analyzer
-            from app.services.growth_comparator import growth_comparator
-            from app.services.growth_phase import get_current_phase
-            from app.routes.dashboard import get_experiment_day
-            
             logger.info("Generating growth comparison...")
             
-            # Get hourly data for last 24 hours (for sensor averages)
-            hourly_data = influxdb_service.get_hourly_stats(self.device_id, hours=24)
+            # Last 24 hours analysed (sensor averages, usually shared with the daily insight)
+            # and daily data for GDD, fetched concurrently off the event loop
+            (hourly_data, pattern_analysis), daily_data = await asyncio.gather(
+                self._get_morning_analysis(),
+                self._offload(influxdb_service.get_daily_stats, self.device_id, 7)
+            )
             
             if not hourly_data:
                 logger.warning("No hourly data available for comparison")
                 return
             
-            # Get daily data for GDD calculation
-            daily_data = influxdb_service.get_daily_stats(self.device_id, days=7)
-            
-            # Analyze patterns to get sensor stats
-            pattern_analysis = pattern_analyzer.analyze_daily_patterns(hourly_data)
             sensor_stats = pattern_analysis.get("sensors", {})
             
             # Get current phase
@@ -190,10 +301,10 @@ class PlantScheduler:
             experiment_day = get_experiment_day()
             
             # Calculate accumulated GDD
-            daily_temps = []
-            for record in daily_data:
-                if record.get("sensor_type") == "temperature":
-                    daily_temps.append(record.get("value", 0))
+            daily_temps = [
+                record["value"] for record in daily_data
+                if record["sensor_type"] == "temperature" and record["value"] is not None
+            ]
             
             accumulated_gdd = growth_comparator.calculate_accumulated_gdd(daily_temps)
             
@@ -213,8 +324,8 @@ class PlantScheduler:
             
             # Save comparison
             self.latest_comparison = {
-                "id": str(uuid.uuid4()),
-                "timestamp": datetime.now(pytz.timezone('Asia/Jakarta')).isoformat(),
+                "id": secrets.token_hex(16),
+                "timestamp": datetime.now(JAKARTA_TZ).isoformat(),
                 "experiment_day": experiment_day,
                 "phase": phase["name"],
                 "comparisons": comparisons,
@@ -224,32 +335,38 @@ class PlantScheduler:
                 "accumulated_gdd": accumulated_gdd
             }
             
-            self._save_latest_comparison()
+            self._schedule_save("latest_comparison")
             logger.info(f"Growth comparison generated. Score: {overall['score']}/100")
             
         except Exception as e:
             logger.error(f"Growth comparison generation error: {e}")
     
+    async def _get_morning_analysis(self):
+        """(hourly_data, pattern_analysis) for the last 24 hours, reused by jobs within the TTL"""
+        cached = self._morning_cache
+        if cached is not None and time.monotonic() - cached[0] < MORNING_ANALYSIS_TTL_SECONDS:
+            return cached[1], cached[2]
+        
+        hourly_data = await self._offload(influxdb_service.get_hourly_stats, self.device_id, 24)
+        if not hourly_data:
+            return hourly_data, None
+        
+        pattern_analysis = await self._offload(pattern_analyzer.analyze_daily_patterns, hourly_data)
+        self._morning_cache = (time.monotonic(), hourly_data, pattern_analysis)
+        return hourly_data, pattern_analysis
+    
     async def generate_daily_insight(self):
         """Generate daily AI insight from pattern analysis"""
         try:
-            from app.services.influxdb import influxdb_service
-            from app.services.pattern_analyzer import pattern_analyzer
-            from app.services.ai_engine import ai_engine
-            from app.services.growth_phase import get_current_phase
-            
             logger.info("Generating daily insight...")
             
-            # Get hourly data for last 24 hours
-            hourly_data = influxdb_service.get_hourly_stats(self.device_id, hours=24)
+            # Get hourly data for last 24 hours and analyze patterns
+            hourly_data, pattern_analysis = await self._get_morning_analysis()
             
             if not hourly_data:
                 logger.warning("No hourly data available for daily insight")
                 return
             
-            # Analyze patterns
-            pattern_analysis = pattern_analyzer.analyze_daily_patterns(hourly_data)
-            
             if not pattern_analysis.get("success"):
                 logger.error(f"Pattern analysis failed: {pattern_analysis.get('error')}")
                 return
@@ -258,7 +375,7 @@ class PlantScheduler:
             phase = get_current_phase()
             
             # Generate AI insight
-            insight_result = ai_engine.generate_daily_insight(pattern_analysis, phase)
+            insight_result = await ai_engine.agenerate_daily_insight(pattern_analysis, phase)
             
             if not insight_result.get("success"):
                 logger.error(f"Insight generation failed: {insight_result.get('error')}")
@@ -266,15 +383,15 @@ class PlantScheduler:
             
             # Save insight
             self.latest_insight = {
-                "id": str(uuid.uuid4()),
-                "timestamp": datetime.now(pytz.timezone('Asia/Jakarta')).isoformat(),
+                "id": secrets.token_hex(16),
+                "timestamp": datetime.now(JAKARTA_TZ).isoformat(),
                 "type": "daily",
                 "insight": insight_result.get("insight"),
                 "analysis": pattern_analysis,
                 "phase": phase["name"]
             }
             
-            self._save_latest_insight()
+            self._schedule_save("latest_insight")
             logger.info("Daily insight generated and saved")
             
         except Exception as e:
@@ -283,15 +400,10 @@ class PlantScheduler:
     async def generate_weekly_insight(self):
         """Generate weekly AI insight from pattern analysis"""
         try:
-            from app.services.influxdb import influxdb_service
-            from app.services.pattern_analyzer import pattern_analyzer
-            from app.services.ai_engine import ai_engine
-            from app.services.growth_phase import get_current_phase
-            
             logger.info("Generating weekly insight...")
             
             # Get daily data for last 7 days
-            daily_data = influxdb_service.get_daily_stats(self.device_id, days=7)
+            daily_data = await self._offload(influxdb_service.get_daily_stats, self.device_id, 7)
             
             if not daily_data:
                 logger.warning("No daily data available for weekly insight")
@@ -308,7 +420,7 @@ class PlantScheduler:
             phase = get_current_phase()
             
             # Generate AI insight
-            insight_result = ai_engine.generate_weekly_insight(pattern_analysis, phase)
+            insight_result = await ai_engine.agenerate_weekly_insight(pattern_analysis, phase)
             
             if not insight_result.get("success"):
                 logger.error(f"Weekly insight generation failed: {insight_result.get('error')}")
@@ -316,118 +428,105 @@ class PlantScheduler:
             
             # Save insight
             self.latest_insight = {
-                "id": str(uuid.uuid4()),
-                "timestamp": datetime.now(pytz.timezone('Asia/Jakarta')).isoformat(),
+                "id": secrets.token_hex(16),
+                "timestamp": datetime.now(JAKARTA_TZ).isoformat(),
                 "type": "weekly",
                 "insight": insight_result.get("insight"),
                 "analysis": pattern_analysis,
                 "phase": phase["name"]
             }
             
-            self._save_latest_insight()
+            self._schedule_save("latest_insight")
             logger.info("Weekly insight generated and saved")
             
         except Exception as e:
             logger.error(f"Weekly insight generation error: {e}")
     
-    def is_sleeping_time(self):
-        now = datetime.now(pytz.timezone('Asia/Jakarta'))
+    def _cached_now(self) -> datetime:
+        """WIB time reused for up to CLOCK_CACHE_SECONDS; dashboard polls only need the hour"""
+        tick = time.monotonic()
+        if self._now_cache is None or tick - self._now_cache[0] >= CLOCK_CACHE_SECONDS:
+            self._now_cache = (tick, datetime.now(JAKARTA_TZ))
+        return self._now_cache[1]
+    
+    def is_sleeping_time(self, now: datetime = None):
+        if now is None:
+            now = self._cached_now()
         hour = now.hour
         # Sleeping time: 22:01 - 05:59
         return hour >= 22 or hour < 6
     
-    def get_next_update_time(self):
-        now = datetime.now(pytz.timezone('Asia/Jakarta'))
-        hour = now.hour
-        
-        schedule_hours = [6, 8, 10, 12, 14, 16, 18, 20, 22]
-        
-        for h in schedule_hours:
-            if hour < h:
-                return f"{h:02d}:00"
+    def get_next_update_time(self, now: datetime = None):
+        if now is None:
+            now = self._cached_now()
+        index = bisect_right(SCHEDULE_HOURS, now.hour)
+        if index < len(SCHEDULE_HOURS):
+            return f"{SCHEDULE_HOURS[index]:02d}:00"
         
         # Next is tomorrow 6:00
         return "06:00"
     
     def start(self):
-        jakarta_tz = pytz.timezone('Asia/Jakarta')
-        
-        # Morning greeting - 06:00 WIB
-        self.scheduler.add_job(
-            self.generate_scheduled_message,
-            CronTrigger(hour=6, minute=0, timezone=jakarta_tz),
-            args=["greeting_morning"],
-            id="greeting_morning"
-        )
-        
-        # Regular reports - 08:00, 10:00, 12:00, 14:00, 16:00, 18:00, 20:00 WIB
-        for hour in [8, 10, 12, 14, 16, 18, 20]:
-            self.scheduler.add_job(
-                self.generate_scheduled_message,
-                CronTrigger(hour=hour, minute=0, timezone=jakarta_tz),
-                args=["report"],
-                id=f"report_{hour}"
-            )
-        
-        # Night greeting - 22:00 WIB
-        self.scheduler.add_job(
-            self.generate_scheduled_message,
-            CronTrigger(hour=22, minute=0, timezone=jakarta_tz),
-            args=["greeting_night"],
-            id="greeting_night"
-        )
-        
-        # Daily insight - 06:05 WIB (after morning greeting)
-        self.scheduler.add_job(
-            self.generate_daily_insight,
-            CronTrigger(hour=6, minute=5, timezone=jakarta_tz),
-            id="daily_insight"
-        )
-        
-        # Weekly insight - Monday 06:10 WIB
-        self.scheduler.add_job(
-            self.generate_weekly_insight,
-            CronTrigger(day_of_week='mon', hour=6, minute=10, timezone=jakarta_tz),
-            id="weekly_insight"
-        )
-        
-        # Growth comparison - Daily 06:15 WIB
-        self.scheduler.add_job(
-            self.generate_growth_comparison,
-            CronTrigger(hour=6, minute=15, timezone=jakarta_tz),
-            id="growth_comparison"
-        )
+        self._timer_task = asyncio.create_task(self._run_timer())
+        logger.info("Plant scheduler started with 15 jobs (9 messages + 2 insights + 1 comparison + 2 moltbook + 1 audio cleanup)")
+    
+    async def _run_timer(self):
+        """Single task that sleeps until the next fire time and launches the jobs due then"""
+        last = datetime.now(JAKARTA_TZ)
+        while True:
+            fire_at, due = _next_fire(last)
+            while (delay := (fire_at - datetime.now(JAKARTA_TZ)).total_seconds()) > 0:
+                await asyncio.sleep(min(delay, MAX_SLEEP_SECONDS))
+            
+            if -delay > MISFIRE_GRACE_SECONDS:
+                logger.warning(f"Skipped {len(due)} job(s) scheduled for {fire_at.isoformat()}: missed by {-delay:.0f}s")
+                last = datetime.now(JAKARTA_TZ)
+                continue
+            last = fire_at
+            
+            for job_id, _, _, _, method, args in due:
+                task = asyncio.create_task(getattr(self, method)(*args), name=job_id)
+                self._job_tasks.add(task)
+                task.add_done_callback(self._job_tasks.discard)
+    
+    async def astop(self):
+        if self._timer_task is not None:
+            self._timer_task.cancel()
+            self._timer_task = None
+        # Stop running jobs first so none of them offloads or schedules a save after the pool is gone
+        jobs = list(self._job_tasks)
+        for task in jobs:
+            task.cancel()
+        await asyncio.gather(*jobs, return_exceptions=True)
         
-        # Moltbook daily post - 18:00 WIB
-        self.scheduler.add_job(
-            self.post_daily_moltbook,
-            CronTrigger(hour=18, minute=0, timezone=jakarta_tz),
-            id="moltbook_daily"
-        )
+        # Saves still on their debounce timer are cancelled; ones already writing are left to finish
+        for task in self._pending_saves.values():
+            task.cancel()
+        self._pending_saves.clear()
+        await asyncio.gather(*list(self._save_tasks), return_exceptions=True)
         
-        # Moltbook weekly summary - Sunday 20:00 WIB
-        self.scheduler.add_job(
-            self.post_weekly_moltbook,
-            CronTrigger(day_of_week='sun', hour=20, minute=0, timezone=jakarta_tz),
-            id="moltbook_weekly"
-        )
+        # Final flush of every piece of state, each under its lock
+        for attr in self._state_files:
+            if getattr(self, attr) is None:
+                continue
+            async with self._save_locks[attr]:
+                await self._offload(self._write_state, attr)
         
-        self.scheduler.start()
-        logger.info("Plant scheduler started with 14 jobs (9 messages + 2 insights + 1 comparison + 2 moltbook)")
-    
-    def stop(self):
-        self.scheduler.shutdown()
+        # Let the last writes land before the lifespan closes the service clients
+        self._executor.shutdown(wait=True)
         logger.info("Plant scheduler stopped")
     
+    async def cleanup_audio(self):
+        """Remove generated TTS clips past their retention window"""
+        # The latest message keeps serving its clip even if no newer one was generated for a week
+        message = self.latest_message or {}
+        keep = frozenset(filter(None, [message.get("audio_file")]))
+        removed = await self._offload(tts_service.cleanup_old_audio, AUDIO_RETENTION_DAYS, keep)
+        logger.info(f"Audio cleanup removed {removed} file(s)")
+    
     async def post_daily_moltbook(self):
         """Generate and post daily Moltbook update"""
         try:
-            from app.services.moltbook import moltbook_service
-            from app.services.influxdb import influxdb_service
-            from app.services.growth_phase import get_current_phase
-            from app.services.growth_comparator import growth_comparator
-            from app.routes.dashboard import get_experiment_day
-            
             logger.info("Generating daily Moltbook post...")
             
             # Get experiment day
@@ -438,7 +537,7 @@ class PlantScheduler:
             phase_name = phase.get("name", "unknown")
             
             # Get 24h sensor stats
-            hourly_data = influxdb_service.get_hourly_stats(self.device_id, hours=24)
+            hourly_data = await self._offload(influxdb_service.get_hourly_stats, self.device_id, 24)
             
             if not hourly_data:
                 logger.warning("No sensor data for Moltbook daily post")
@@ -475,7 +574,7 @@ class PlantScheduler:
                     notable = anomalies[0].get("description", "Anomaly detected")
             
             # Post to Moltbook
-            result = moltbook_service.post_daily_update(
+            result = await moltbook_service.apost_daily_update(
                 experiment_day=experiment_day,
                 phase_name=phase_name,
                 sensor_data=sensor_stats,
@@ -495,11 +594,6 @@ class PlantScheduler:
     async def post_weekly_moltbook(self):
         """Generate and post weekly Moltbook summary"""
         try:
-            from app.services.moltbook import moltbook_service
-            from app.services.influxdb import influxdb_service
-            from app.services.growth_phase import get_current_phase
-            from app.routes.dashboard import get_experiment_day
-            
             logger.info("Generating weekly Moltbook summary...")
             
             # Calculate week number
@@ -511,7 +605,7 @@ class PlantScheduler:
             phase_name = phase.get("name", "unknown")
             
             # Get 7-day sensor stats
-            hourly_data = influxdb_service.get_hourly_stats(self.device_id, hours=168)
+            hourly_data = await self._offload(influxdb_service.get_hourly_stats, self.device_id, 168)
             
             if not hourly_data:
                 logger.warning("No sensor data for Moltbook weekly post")
@@ -564,7 +658,7 @@ class PlantScheduler:
                 next_expectations = "Rapid growth phase, monitor for flowering initiation"
             
             # Post to Moltbook
-            result = moltbook_service.post_weekly_summary(
+            result = await moltbook_service.apost_weekly_summary(
                 week_num=week_num,
                 phase_name=phase_name,
                 weekly_stats=weekly_stats,
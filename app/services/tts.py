@@ -1,58 +1,85 @@
 import httpx
 import logging
+import orjson
 import os
+import time
 import uuid
 from typing import Optional
 from app.config import settings
 
 logger = logging.getLogger(__name__)
 
+AUDIO_CHUNK_SIZE = 32 * 1024
+
+# Resolved once at import instead of re-joining the relative path per service instance
+AUDIO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "audio_files"))
+
+# Generated clips older than this are removed by the nightly cleanup job
+AUDIO_RETENTION_DAYS = 7
+
 class TTSService:
     def __init__(self):
         self.api_key = settings.ELEVENLABS_API_KEY
         self.base_url = "https://api.elevenlabs.io/v1"
         self.voice_id = "EXAVITQu4vr4xnSDxMaL"  # Bella - soft, gentle voice
         self.model_id = "eleven_multilingual_v2"
-        self.audio_dir = os.path.join(os.path.dirname(__file__), "..", "..", "audio_files")
+        self.audio_dir = AUDIO_DIR
         
         # Create audio directory if not exists
         os.makedirs(self.audio_dir, exist_ok=True)
-    
-    def generate_speech(self, text: str) -> Optional[str]:
-        try:
-            url = f"{self.base_url}/text-to-speech/{self.voice_id}"
-            
-            headers = {
+        
+        # Everything after "text" in the request body, pre-encoded without its opening brace
+        self._payload_tail = orjson.dumps({
+            "model_id": self.model_id,
+            "voice_settings": {
+                "stability": 0.5,
+                "similarity_boost": 0.75,
+                "style": 0.5,
+                "use_speaker_boost": True
+            }
+        })[1:]
+        
+        # Pooled client so each clip reuses the TLS connection to ElevenLabs
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=10),
+            headers={
                 "Accept": "audio/mpeg",
                 "Content-Type": "application/json",
                 "xi-api-key": self.api_key
             }
+        )
+    
+    async def aclose(self):
+        await self.client.aclose()
+    
+    async def agenerate_speech(self, text: str) -> Optional[str]:
+        try:
+            # Only the text varies; the rest of the body was encoded once in __init__
+            body = b'{"text":' + orjson.dumps(text) + b"," + self._payload_tail
             
-            payload = {
-                "text": text,
-                "model_id": self.model_id,
-                "voice_settings": {
-                    "stability": 0.5,
-                    "similarity_boost": 0.75,
-                    "style": 0.5,
-                    "use_speaker_boost": True
-                }
-            }
+            # Generate unique filename
+            filename = f"{uuid.uuid4()}.mp3"
+            filepath = os.path.join(self.audio_dir, filename)
+            tmp_path = f"{filepath}.part"
             
-            with httpx.Client(timeout=30.0) as client:
-                response = client.post(url, headers=headers, json=payload)
-                response.raise_for_status()
-                
-                # Generate unique filename
-                filename = f"{uuid.uuid4()}.mp3"
-                filepath = os.path.join(self.audio_dir, filename)
-                
-                # Save audio file
-                with open(filepath, "wb") as f:
-                    f.write(response.content)
-                
-                logger.info(f"Audio generated: {filename}")
-                return filename
+            # Stream the audio to disk in chunks instead of buffering the whole clip
+            try:
+                async with self.client.stream("POST", f"/text-to-speech/{self.voice_id}", content=body) as response:
+                    response.raise_for_status()
+                    with open(tmp_path, "wb") as f:
+                        async for chunk in response.aiter_bytes(AUDIO_CHUNK_SIZE):
+                            f.write(chunk)
+                # Only a complete clip ever appears under its served name
+                os.replace(tmp_path, filepath)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            
+            logger.info(f"Audio generated: {filename}")
+            return filename
         
         except Exception as e:
             logger.error(f"TTS error: {e}")
@@ -74,5 +101,22 @@ class TTSService:
         except Exception as e:
             logger.error(f"Failed to delete audio: {e}")
             return False
+    
+    def cleanup_old_audio(self, max_age_days: int = AUDIO_RETENTION_DAYS, keep: frozenset = frozenset()) -> int:
+        """Delete clips (and stray .part files) older than max_age_days, except names in keep; returns how many were removed"""
+        cutoff = time.time() - max_age_days * 86400
+        removed = 0
+        try:
+            with os.scandir(self.audio_dir) as it:
+                for entry in it:
+                    try:
+                        if entry.name not in keep and entry.is_file() and entry.stat().st_mtime < cutoff:
+                            os.remove(entry.path)
+                            removed += 1
+                    except FileNotFoundError:
+                        pass
+        except Exception as e:
+            logger.error(f"Failed to clean up audio: {e}")
+        return removed
 
 tts_service = TTSService()
\ No newline at end of file